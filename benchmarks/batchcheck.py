@@ -0,0 +1,101 @@
+# ==========================================
+#   fill-batch Check
+#   Runs run_batch() against fake drivers:
+#   tab switching (with and without window
+#   handles), failing jobs and the summary.
+#
+#   Usage: python benchmarks/batchcheck.py
+# ==========================================
+
+import os
+import sys
+import shutil
+
+from fakeform import FORM_TITLE, Checker, isolate_home, write_sheet, FakeWebDriver
+
+
+class FakeTabs:
+    """Several FakeWebDriver pages behind one driver, switched by window handle like Selenium's."""
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.current_window_handle = next(iter(pages))
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current_window_handle = handle
+
+    @property
+    def window_handles(self):
+        return list(self.pages)
+
+    def __getattr__(self, name):
+        return getattr(self.pages[self.current_window_handle], name)
+
+
+def main() -> int:
+    home = isolate_home()
+    check = Checker()
+
+    try:
+        from rich.console import Console
+        from typer.testing import CliRunner
+        from cosmo import batch
+        from cosmo.main import app
+
+        batch.console = Console(file=open(os.devnull, "w"))
+        sheet = write_sheet(os.path.join(home, "sheet.csv"), {"title": "Hello", "body": "World"})
+
+        # Selenium-style browser with two tabs; the job names the second one by handle
+        tabbed = FakeTabs({
+            "H1": FakeWebDriver({"title": "", "body": ""}, latency_ms=0, title="Translations for one first"),
+            "H2": FakeWebDriver({"title": "", "body": "Old"}, latency_ms=0, title="Translations for two second"),
+        })
+        # CDP-style browser: no window handles, so the tab is matched against the modal title
+        handleless = FakeWebDriver({"title": "", "body": ""}, latency_ms=0)
+        browsers = {"tabs:1": tabbed, "cdp:1": handleless, "cdp:2": FakeWebDriver({}, latency_ms=0)}
+
+        jobs = [
+            {"name": "by-handle", "debugger": "tabs:1", "tab": "H2", "sheet": sheet},
+            {"name": "by-title", "debugger": "cdp:1", "tab": FORM_TITLE.split(" ")[2], "sheet": sheet},
+            {"name": "no-such-tab", "debugger": "cdp:2", "tab": "CDwindow-missing", "sheet": sheet},
+            {"name": "no-such-sheet", "debugger": "cdp:2", "tab": None, "sheet": os.path.join(home, "missing.csv")},
+        ]
+        results = batch.run_batch(jobs, workers=2, on_conflict="o", connect_browser=browsers.__getitem__)
+
+        check("jobs come back in manifest order", [result["job"]["name"] for result in results] == [job["name"] for job in jobs])
+        check("window handle job fills the named tab",
+              results[0]["error"] is None and tabbed.pages["H2"].values == {"title": "Hello", "body": "World"}
+              and tabbed.pages["H1"].values == {"title": "", "body": ""}, str(results[0]))
+        check("conflicts follow --on-conflict", results[0]["counts"] and results[0]["counts"]["overwritten"] == 1, str(results[0]["counts"]))
+        check("handle-less backend matches the tab by modal title",
+              results[1]["error"] is None and handleless.values == {"title": "Hello", "body": "World"}, str(results[1]))
+        check("unmatched tab fails only its own job", results[2]["counts"] is None and "CDwindow-missing" in (results[2]["error"] or ""), str(results[2]))
+        check("missing sheet fails only its own job", results[3]["counts"] is None and bool(results[3]["error"]), str(results[3]))
+
+        try:
+            batch.display_batch_summary(results)
+            check("summary renders error rows", True)
+        except Exception as error:
+            check("summary renders error rows", False, repr(error))
+
+        # CLI: manifest problems are reported, not raised
+        runner = CliRunner()
+        bad_toml = os.path.join(home, "bad.toml")
+        with open(bad_toml, "w") as f:
+            f.write("[[jobs]\nsheet = \n")
+        no_sheet = os.path.join(home, "nosheet.toml")
+        with open(no_sheet, "w") as f:
+            f.write("[[jobs]]\nport = 9222\n")
+        for label, manifest in (("missing", os.path.join(home, "absent.toml")), ("bad TOML", bad_toml), ("job without a sheet", no_sheet)):
+            result = runner.invoke(app, ["fill-batch", manifest])
+            check(f"{label} manifest exits 1 with an error", result.exit_code == 1 and result.output.startswith("Error:")
+                  and not isinstance(result.exception, (OSError, ValueError)), result.output.strip())
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+    return check.summary()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# ==========================================
+#   CDP Backend Check
+#   Runs CDPBrowser against the stand-in
+#   server: single scripts, pipelined
+#   writes, replies arriving out of order
+#   and a script that fails mid-batch.
+#
+#   Usage: python benchmarks/cdpcheck.py
+# ==========================================
+
+import sys
+
+from fakeform import Checker, isolate_home, generate_values
+
+
+def main() -> int:
+    isolate_home()
+    check = Checker()
+
+    from cosmo.modules import writer
+    from cosmo.modules.cdp import CDPError
+    from cosmo.modules.snapshot import snapshot_values
+    from cdpserver import CDPForm
+
+    # Up to 20 ms of jitter on a 1 ms reply: later commands regularly overtake earlier ones
+    form = CDPForm(latency_ms=1, per_field_us=0, jitter_ms=20)
+    browser = form.driver
+    try:
+        values = generate_values(200)
+        form.load({name: "" for name in values})
+
+        # execute_script: one round trip, the page's values come back as-is
+        check("execute_script returns the script's value", snapshot_values(browser) == form.page.values)
+        check("find_element reads the modal title", browser.find_element("css selector", ".MuiTypography-h6").text == form.page.title)
+
+        # execute_script_many: every chunk in flight before the first reply
+        sent = form.calls
+        form.server.replies.clear()
+        missing = writer.write_values(browser, {**values, "not-on-page": "x"}, chunk_size=10)
+        replies = list(form.server.replies)
+        check("pipelined writes are applied", form.page.values == values)
+        check("pipelined writes report missing fields", missing == ["not-on-page"], missing)
+        check("one command per chunk", form.calls - sent == 21, form.calls - sent)
+        check("replies arrived out of order", replies != sorted(replies), replies)
+
+        arg_lists = [(chunk,) for chunk in writer._chunked([[name, "?"] for name in values] + [["absent-%d" % i, "?"] for i in range(20)], 11)]
+        results = list(browser.execute_script_many(writer.WRITE_SCRIPT, arg_lists))
+        expected = [[name for name, _ in chunk if name.startswith("absent-")] for (chunk,) in arg_lists]
+        check("results come back in call order", results == expected)
+
+        # A failing script: the error surfaces at its position, the rest of the batch still lands
+        chunks = [[["title-%d" % i, "v"]] for i in range(5)]
+        form.load({name: "" for chunk in chunks for name, _ in chunk})
+        chunks[2] = [["title-2"]]  # Malformed entry: the page script throws
+        results = browser.execute_script_many(writer.WRITE_SCRIPT, [(chunk,) for chunk in chunks])
+        yielded, error = [], None
+        try:
+            for result in results:
+                yielded.append(result)
+        except CDPError as e:
+            error = e
+        check("failing script raises CDPError", error is not None and "ValueError" in str(error), error)
+        check("results before the failure are yielded", yielded == [[], []], yielded)
+        check("calls after the failure still ran", all(form.page.values["title-%d" % i] == "v" for i in (0, 1, 3, 4)), form.page.values)
+
+        try:
+            browser.execute_script("return 1;")
+            check("unknown script raises CDPError", False, "no error")
+        except CDPError as e:
+            check("unknown script raises CDPError", "does not understand" in str(e), e)
+
+        check("connection still usable after failures", snapshot_values(browser) == form.page.values)
+        check("no replies left pending", not browser._pending, browser._pending)
+    finally:
+        form.quit()
+
+    return check.summary()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# ==========================================
+#   Stand-in CDP Server
+#   Speaks just enough DevTools protocol for
+#   Cosmo's CDP backend: /json/list discovery
+#   and Runtime.evaluate, answered by a
+#   FakeWebDriver.
+# ==========================================
+
+import re
+import json
+import random
+import asyncio
+import threading
+from http import HTTPStatus
+
+from fakeform import FakeWebDriver
+
+# Matches cosmo.modules.cdp.script_expression()
+EXPRESSION_PATTERN = re.compile(r"^\(function\(\) \{\n(.*)\n\}\)\.apply\(null, (.*)\)$", re.DOTALL)
+
+
+class StandInCDPServer:
+    """Evaluates Cosmo's page scripts against `driver` over a real websocket.
+
+    Like a renderer, scripts run one at a time in arrival order. Each reply is
+    then held back by `latency_ms` concurrently, so pipelined commands overlap
+    their network time and sequential ones pay it once per call. `jitter_ms`
+    adds a random (seeded) extra delay per reply, so replies can overtake each
+    other; `replies` records the command ids in the order they were sent back.
+    """
+
+    def __init__(self, driver: FakeWebDriver, latency_ms: float = 2.0, host: str = "127.0.0.1",
+                 jitter_ms: float = 0.0, seed: int = 0):
+        self.driver = driver
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.host = host
+        self.port = None
+        self.commands = 0
+        self.replies = []
+        self._random = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Starts serving on a free port and returns its host:port debugger address."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._serve(), self._loop).result(10)
+        return self.address
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    async def _serve(self):
+        from websockets.asyncio.server import serve
+        self._server = await serve(self._handle, self.host, 0, process_request=self._discovery, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _shutdown(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _discovery(self, connection, request):
+        if request.path.startswith("/json"):
+            targets = [{"type": "page", "title": "Cosmo stand-in", "url": "about:blank",
+                        "webSocketDebuggerUrl": f"ws://{self.address}/devtools/page/stand-in"}]
+            return connection.respond(HTTPStatus.OK, json.dumps(targets))
+        return None  # Everything else upgrades to the websocket
+
+    async def _handle(self, connection):
+        async for message in connection:
+            command = json.loads(message)
+            self.commands += 1
+            reply = {"id": command["id"], "result": self._dispatch(command)}
+            delay = self.latency + self._random.random() * self.jitter
+            self._loop.create_task(self._reply(connection, reply, delay))
+
+    async def _reply(self, connection, reply, delay):
+        await asyncio.sleep(delay)
+        self.replies.append(reply["id"])
+        await connection.send(json.dumps(reply))
+
+    def _dispatch(self, command: dict) -> dict:
+        if command.get("method") != "Runtime.evaluate":
+            return {}
+        match = EXPRESSION_PATTERN.match(command["params"]["expression"])
+        if not match:
+            return {"exceptionDetails": {"text": "Stand-in server only runs Cosmo's scripts"}}
+        try:
+            value = self.driver.execute_script(match.group(1), *json.loads(match.group(2)))
+        except Exception as e:  # A script that throws in the page comes back as exceptionDetails
+            return {"exceptionDetails": {"text": f"{type(e).__name__}: {e}"}}
+        return {"result": {"type": "object", "value": value}}
+
+
+class CDPForm:
+    """A FakeWebDriver page reached through the stand-in server and Cosmo's CDP backend."""
+
+    def __init__(self, latency_ms: float = 2.0, per_field_us: float = 5.0, jitter_ms: float = 0.0):
+        from cosmo.modules.cdp import CDPBrowser
+
+        # Latency is modelled by the server per reply, not by the fake driver per call
+        self.page = FakeWebDriver({}, latency_ms=0, per_field_us=per_field_us)
+        self.server = StandInCDPServer(self.page, latency_ms=latency_ms, jitter_ms=jitter_ms)
+        self.driver = CDPBrowser(self.server.start())
+
+    @property
+    def calls(self) -> int:
+        return self.server.commands
+
+    def load(self, state: dict):
+        self.page.load(state)
+
+    def quit(self):
+        self.driver.quit()
+        self.server.stop()
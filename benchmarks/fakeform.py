@@ -0,0 +1,227 @@
+# ==========================================
+#   Fake Form Harness
+#   Generated forms, an in-process fake
+#   WebDriver and a headless Chrome driver,
+#   so Cosmo can run without a live site.
+# ==========================================
+
+import os
+import sys
+import html
+import time
+import shutil
+import random
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+FORM_UUID = "bench-0000-uuid"
+FORM_TITLE = f"Translations for {FORM_UUID} bench-customer"
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua translation bonjour hola hallo").split()
+
+
+def isolate_home() -> str:
+    """Points HOME at a scratch config so history, logs, caches and backups stay out of the real one.
+    Must run before anything from cosmo is imported."""
+    home = tempfile.mkdtemp(prefix="cosmo-bench-")
+    os.makedirs(os.path.join(home, ".config", "cosmo"))
+    shutil.copy(os.path.join(REPO_ROOT, "cosmo", "data", "config.toml"), os.path.join(home, ".config", "cosmo", "config.toml"))
+    os.environ["HOME"] = home
+    return home
+
+
+class Checker:
+    """Pass/fail bookkeeping for the check scripts: call it once per check, then exit with summary()."""
+
+    def __init__(self):
+        self.failures = []
+
+    def __call__(self, name: str, passed: bool, detail=""):
+        print(f"{'ok  ' if passed else 'FAIL'}  {name}" + (f"  ({detail})" if detail and not passed else ""))
+        if not passed:
+            self.failures.append(name)
+
+    def summary(self) -> int:
+        """Prints the outcome and returns the exit code: 1 if any check failed."""
+        print(f"\n{len(self.failures)} failed" if self.failures else "\nAll checks passed")
+        return 1 if self.failures else 0
+
+
+# ==================================
+#   Generated data
+# ==================================
+
+def generate_values(n_fields: int, seed: int = 0) -> dict:
+    """Returns {field_name: sheet value}. Roughly one value in five is a paragraph,
+    the rest are short labels, like a translation sheet."""
+    rng = random.Random(seed)
+    values = {}
+    for i in range(n_fields):
+        length = rng.randint(40, 120) if i % 5 == 0 else rng.randint(1, 6)
+        values[f"field_{i:05d}.label"] = " ".join(rng.choice(WORDS) for _ in range(length))
+    return values
+
+
+def page_state(sheet_values: dict, empty: float = 0.0, drifted: float = 0.0, seed: int = 1) -> dict:
+    """Derives what the page holds from the sheet: a share of fields left empty,
+    a share with one word changed (conflicts), the rest already equal."""
+    rng = random.Random(seed)
+    state = {}
+    for name, value in sheet_values.items():
+        roll = rng.random()
+        if roll < empty:
+            state[name] = ""
+        elif roll < empty + drifted:
+            words = value.split(" ")
+            words[rng.randrange(len(words))] = "CHANGED"
+            state[name] = " ".join(words)
+        else:
+            state[name] = value
+    return state
+
+
+def write_sheet(path: str, sheet_values: dict) -> str:
+    import pandas as pd
+    pd.DataFrame({"field_name": list(sheet_values), "value": list(sheet_values.values())}).to_csv(path, index=False)
+    return path
+
+
+def render_form_html(state: dict, title: str = FORM_TITLE) -> str:
+    """A static stand-in for the MUI modal: a title and one named input/textarea per field."""
+    rows = []
+    for name, value in state.items():
+        escaped_name, escaped_value = html.escape(name, quote=True), html.escape(value, quote=True)
+        if len(value) > 80:
+            rows.append(f'<div><label>{escaped_name}</label><textarea name="{escaped_name}">{html.escape(value)}</textarea></div>')
+        else:
+            rows.append(f'<div><label>{escaped_name}</label><input name="{escaped_name}" value="{escaped_value}"></div>')
+    return ("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Cosmo bench</title></head><body>"
+            f'<div role="dialog"><h6 class="MuiTypography-h6">{html.escape(title)}</h6><form>'
+            + "".join(rows) + "</form></div></body></html>")
+
+
+# ==================================
+#   Fake WebDriver
+# ==================================
+
+class FakeElement:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeWebDriver:
+    """Answers Cosmo's page scripts from a dict, sleeping to simulate the WebDriver hop.
+
+    `latency_ms` is charged once per call; `per_field_us` once per field a
+    script reads or writes, standing in for the browser-side DOM work.
+    """
+
+    def __init__(self, state: dict, latency_ms: float = 2.0, per_field_us: float = 5.0, title: str = FORM_TITLE):
+        from cosmo.modules import snapshot, writer, fields, cdp
+        self._scripts = {
+            cdp.ELEMENT_TEXT_SCRIPT: self._element_text,
+            snapshot.SNAPSHOT_SCRIPT: self._snapshot,
+            writer.WRITE_SCRIPT: self._write,
+            writer.CHECKED_WRITE_SCRIPT: self._checked_write,
+            fields.STATS_SCRIPT: self._stats,
+            fields.RESCAN_SCRIPT: lambda: len(self.values),
+        }
+        self.values = dict(state)
+        self.title = title
+        self.latency = latency_ms / 1000
+        self.per_field = per_field_us / 1_000_000
+        self.calls = 0
+
+    def load(self, state: dict):
+        """Replaces the page contents, like navigating to a fresh copy of the form."""
+        self.values = dict(state)
+
+    def _charge(self, fields: int):
+        self.calls += 1
+        time.sleep(self.latency + fields * self.per_field)
+
+    def _snapshot(self):
+        self._charge(len(self.values))
+        return dict(self.values)
+
+    def _write(self, entries):
+        self._charge(len(entries))
+        missing = []
+        for name, value in entries:
+            if name in self.values:
+                self.values[name] = value
+            else:
+                missing.append(name)
+        return missing
+
+    def _checked_write(self, entries):
+        from cosmo.modules.normalize import normalize_series
+        import pandas as pd
+        self._charge(len(entries))
+        found = [name for name, _, _ in entries if name in self.values]
+        current = dict(zip(found, normalize_series(pd.Series([self.values[name] for name in found], dtype=object))))
+        missing, stale = [], []
+        for name, expected, value in entries:
+            if name not in self.values:
+                missing.append(name)
+            elif current[name] != expected:
+                stale.append([name, self.values[name]])
+            else:
+                self.values[name] = value
+        return {"missing": missing, "stale": stale}
+
+    def _element_text(self, selector):
+        self._charge(0)
+        return self.title if selector == ".MuiTypography-h6" else None
+
+    def _stats(self):
+        return {"fields": len(self.values), "dirty": 0, "scans": 1, "lookups": 0}
+
+    def execute_script(self, script, *args):
+        handler = self._scripts.get(script)
+        if handler is None:
+            raise NotImplementedError(f"FakeWebDriver does not understand this script: {script[:60]!r}")
+        return handler(*args)
+
+    def find_element(self, by, selector):
+        from selenium.common.exceptions import NoSuchElementException
+        self._charge(0)
+        if selector == ".MuiTypography-h6" and self.title:
+            return FakeElement(self.title)
+        raise NoSuchElementException(selector)
+
+    def quit(self):
+        pass
+
+
+# ==================================
+#   Headless Chrome
+# ==================================
+
+class ChromeForm:
+    """Serves generated forms from files to a headless Chrome."""
+
+    def __init__(self, work_dir: str):
+        from selenium import webdriver
+
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        self.driver = webdriver.Chrome(options=options)
+        self.work_dir = work_dir
+        self._pages = 0
+
+    def load(self, state: dict):
+        self._pages += 1
+        path = os.path.join(self.work_dir, f"form_{self._pages}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_form_html(state))
+        self.driver.get("file://" + path)
+
+    def quit(self):
+        self.driver.quit()
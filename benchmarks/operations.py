@@ -0,0 +1,202 @@
+# ==========================================
+#   Form Operation Benchmarks
+#   Times fill/verify/diff/backup/revert
+#   against generated forms, on a fake
+#   WebDriver or a headless Chrome.
+#
+#   Usage: python benchmarks/operations.py [--fields 100 1000 10000]
+#              [--backend fake|cdp|chrome] [--latency-ms 2] [--runs 3]
+#              [--out results.json] [--compare baseline.json]
+# ==========================================
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+
+from fakeform import REPO_ROOT, FORM_UUID, generate_values, page_state, write_sheet, isolate_home, FakeWebDriver, ChromeForm
+
+OPERATIONS = ["autofill", "overwrite_fill", "verify", "display_differences", "backup_data", "revert_file"]
+
+# What the page holds before each operation. autofill prompts on conflicts,
+# so its page only has empty and already-equal fields.
+SCENARIOS = {
+    "autofill":            {"empty": 0.5},
+    "overwrite_fill":      {"drifted": 0.3},
+    "verify":              {"drifted": 0.3},
+    "display_differences": {"drifted": 0.3},
+    "backup_data":         {"drifted": 0.3},
+    "revert_file":         {"empty": 1.0},
+}
+
+
+def git_revision() -> str:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ==================================
+#   One size, every operation
+# ==================================
+
+def run_size(n_fields, args, work_dir, page):
+    import pandas as pd
+    from rich.console import Console
+    from cosmo import diff, verify
+    from cosmo.fill import CosmoFiller
+    from cosmo.backup import BackupControl
+    from cosmo.modules.sheets import load_sheet
+
+    # Render into a null sink: formatting cost stays in, terminal I/O stays out
+    quiet = Console(file=open(os.devnull, "w"))
+    diff.console = verify.console = quiet
+
+    sheet_values = generate_values(n_fields)
+    sheet = write_sheet(os.path.join(work_dir, f"sheet_{n_fields}.csv"), sheet_values)
+    backup_file = BackupControl().save_to_backup(
+        pd.DataFrame({"field_name": list(sheet_values), "value": list(sheet_values.values())}), FORM_UUID)
+
+    page.load(page_state(sheet_values))
+    browser = getattr(page, "driver", page)
+    cosmo = CosmoFiller(browser=browser)
+    cosmo.console = quiet
+    sheet_frame = load_sheet(sheet)  # Warms the sidecar
+
+    calls = {
+        "autofill":            lambda: cosmo.autofill(sheet),
+        "overwrite_fill":      lambda: cosmo.overwrite_fill(sheet),
+        "verify":              lambda: verify.verify(sheet, browser=browser),
+        "display_differences": lambda: diff.display_differences(sheet, browser=browser),
+        "backup_data":         lambda: cosmo.backup_data(sheet_frame),
+        "revert_file":         lambda: cosmo.revert_file(backup_file),
+    }
+
+    results = []
+    for operation in args.operations:
+        state = page_state(sheet_values, **SCENARIOS[operation])
+        timings, round_trips = [], []
+
+        for run in range(args.warmup + args.runs):
+            page.load(state)
+            before = getattr(page, "calls", None)
+            start = time.perf_counter()
+            calls[operation]()
+            elapsed = (time.perf_counter() - start) * 1000
+            if run >= args.warmup:
+                timings.append(elapsed)
+                if before is not None:
+                    round_trips.append(page.calls - before)
+
+        median = statistics.median(timings)
+        result = {
+            "operation": operation,
+            "fields": n_fields,
+            "runs_ms": timings,
+            "median_ms": median,
+            "p95_ms": percentile(timings, 95),
+            "fields_per_s": n_fields / (median / 1000) if median else None,
+            "round_trips": statistics.median(round_trips) if round_trips else None,
+        }
+        results.append(result)
+        print(f"{operation:<20} {n_fields:>6} fields  {median:9.1f} ms  {result['fields_per_s']:10.0f} fields/s"
+              + (f"  {result['round_trips']:.0f} round trips" if result["round_trips"] is not None else ""))
+
+    return results
+
+
+# ==================================
+#   Comparing against a baseline
+# ==================================
+
+def compare(results, baseline_path, threshold):
+    """Prints operations whose median got slower than `threshold` percent. Returns True if any did."""
+    with open(baseline_path) as f:
+        baseline = {(r["operation"], r["fields"]): r for r in json.load(f)["results"]}
+
+    regressed = False
+    for result in results:
+        before = baseline.get((result["operation"], result["fields"]))
+        if not before:
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+        if change > threshold:
+            regressed = True
+            print(f"REGRESSION {result['operation']} @ {result['fields']} fields: "
+                  f"{before['median_ms']:.1f} -> {result['median_ms']:.1f} ms (+{change:.0f}%)")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Cosmo's form operations against generated forms.")
+    parser.add_argument("--fields", type=int, nargs="+", default=[100, 1000, 10000], help="Form sizes to run.")
+    parser.add_argument("--backend", choices=["fake", "cdp", "chrome"], default="fake",
+                        help="In-process fake WebDriver, the CDP backend against a stand-in DevTools server, or headless Chrome.")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="fake/cdp: simulated latency per browser call.")
+    parser.add_argument("--per-field-us", type=float, default=5.0, help="fake/cdp: simulated browser work per field touched.")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per operation and size.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before the timed ones.")
+    parser.add_argument("--out", help="Write results as JSON to this path.")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --out to compare against.")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Percent slowdown that counts as a regression.")
+    args = parser.parse_args()
+
+    home = isolate_home()
+    work_dir = os.path.join(home, "forms")
+    os.makedirs(work_dir)
+
+    if args.backend == "chrome":
+        try:
+            page = ChromeForm(work_dir)
+        except Exception as e:
+            print(f"Could not start headless Chrome: {e}")
+            sys.exit(1)
+    elif args.backend == "cdp":
+        from cdpserver import CDPForm
+        page = CDPForm(latency_ms=args.latency_ms, per_field_us=args.per_field_us)
+    else:
+        page = FakeWebDriver({}, latency_ms=args.latency_ms, per_field_us=args.per_field_us)
+
+    results = []
+    try:
+        for n_fields in args.fields:
+            results.extend(run_size(n_fields, args, work_dir, page))
+    finally:
+        page.quit()
+        shutil.rmtree(home, ignore_errors=True)
+
+    import pandas as pd
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "latency_ms": args.latency_ms if args.backend != "chrome" else None,
+            "per_field_us": args.per_field_us if args.backend != "chrome" else None,
+            "runs": args.runs,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=4)
+
+    regressed = compare(results, args.compare, args.threshold) if args.compare else False
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# ==========================================
+#   CLI Startup Benchmark
+#   Times the light commands in fresh
+#   interpreters, net of an empty Typer
+#   app, and checks that they do not drag
+#   in selenium/pandas/sqlite.
+#
+#   Usage: python benchmarks/startup.py [--runs 10] [--budget-ms 100]
+# ==========================================
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIGHT_COMMANDS = [
+    ["--help"],
+    ["stage", "--help"],
+    ["stage", "show"],
+]
+
+HEAVY_MODULES = ["selenium", "pandas", "sqlite3", "rich"]
+
+# The framework floor: an empty app configured like cosmo.main's, so the
+# budget measures what Cosmo itself adds on top of Python and Typer
+BARE_TYPER_APP = (
+    "import typer; app = typer.Typer(add_completion=False, rich_markup_mode=None, pretty_exceptions_enable=False)\n"
+    "@app.command()\ndef main(): pass\n"
+    "app()"
+)
+
+IMPORT_CHECK = (
+    "import sys, json; import cosmo.main; "
+    f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+)
+
+
+def time_command(args, runs):
+    """Returns the wall time of each run of `python -m cosmo.main <args>`, in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "cosmo.main", *args], cwd=REPO_ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def baseline(code, runs):
+    """Median wall time of `python -c <code> --help`, in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code, "--help"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Cosmo CLI startup time.")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command.")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Median budget per light command, above an empty Typer app.")
+    parser.add_argument("--out", help="Write results as JSON to this path.")
+    args = parser.parse_args()
+
+    result = subprocess.run([sys.executable, "-c", IMPORT_CHECK], cwd=REPO_ROOT, capture_output=True, text=True)
+    leaked = json.loads(result.stdout or "[]")
+
+    interpreter = baseline("pass", args.runs)
+    floor = baseline(BARE_TYPER_APP, args.runs)
+    results = {"interpreter_ms": interpreter, "baseline_ms": floor, "leaked_modules": leaked, "commands": {}}
+    failed = bool(leaked)
+
+    print(f"python -c pass: {interpreter:.1f} ms")
+    print(f"empty Typer app --help: {floor:.1f} ms (subtracted below)")
+    for command in LIGHT_COMMANDS:
+        timings = time_command(command, args.runs)
+        median = statistics.median(timings) - floor
+        label = "cosmo " + " ".join(command)
+        results["commands"][label] = {"median_ms": median, "runs_ms": timings}
+        status = "ok" if median <= args.budget_ms else "OVER BUDGET"
+        failed = failed or median > args.budget_ms
+        print(f"{label:<24} {median:7.1f} ms  {status}")
+
+    if leaked:
+        print(f"Importing cosmo.main loaded heavy modules: {', '.join(leaked)}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=4)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,218 @@
-import toml
 import pandas as pd
 import datetime
+import json
+import gzip
 import os
+from .modules.sheets import load_sheet
+from .modules.objects import write_json_atomic
+from .modules.config import load_config
+
+# Backups are stored per UUID as gzipped, column-oriented JSON:
+#
+#   <backup_directory>/<uuid>/<uuid>_<timestamp>.json.gz
+#       base:  {"kind": "base", "uuid": ..., "timestamp": ..., "field_name": [...], "value": [...]}
+#       delta: {"kind": "delta", ..., "field_name": [changed...], "value": [...], "removed": [...]}
+#   <backup_directory>/<uuid>/index.json
+#       [{"file": ..., "timestamp": <ISO>, "fields": <count>, "kind": "base"|"delta"}, ...]   (oldest first)
+#
+# A delta holds only the fields that changed since the backup before it, so the
+# state at any point is the closest earlier base with the deltas after it folded
+# in. A new base is written every `rebase_every` backups to keep chains short.
+#
+# Older *.xlsx backups can still be reverted to and read with load_backup().
+
+BACKUP_SUFFIX = ".json.gz"
+DEFAULT_REBASE_EVERY = 20
 
 class BackupControl:
 
     def __init__(self, config_file_path='~/.config/cosmo/config.toml'):
         self.config_file_path = os.path.expanduser(config_file_path)
         self.load_config()
+        self.backup_directory = os.path.expanduser(self.config.get('Backup', {}).get('backup_directory', '~/.config/cosmo/backups'))
+        self.rebase_every = int(self.config.get('Backup', {}).get('rebase_every', DEFAULT_REBASE_EVERY))
 
     def load_config(self):
         try:
-            with open(self.config_file_path, 'r') as config_file:
-                self.config = toml.load(config_file)
+            self.config = load_config(self.config_file_path)
         except FileNotFoundError:
             raise Exception(f"Config file not found at {self.config_file_path}")
 
     @staticmethod
     def read_fields_from_excel(file_path) -> pd.DataFrame:
-        df = pd.read_excel(file_path)
+        df = load_sheet(file_path)
         return df.fillna("")
 
+    # ==================================
+    #   Per-UUID index
+    # ==================================
+
+    def uuid_directory(self, uuid: str) -> str:
+        return os.path.join(self.backup_directory, uuid)
+
+    def load_index(self, uuid: str) -> list:
+        return load_index(self.uuid_directory(uuid))
+
+    def save_index(self, uuid: str, index: list):
+        write_json_atomic(os.path.join(self.uuid_directory(uuid), 'index.json'), index)
+
+    def latest_backup(self, uuid: str):
+        """Path of the newest backup for `uuid`, straight from its index."""
+        index = self.load_index(uuid)
+        return os.path.join(self.uuid_directory(uuid), index[-1]['file']) if index else None
+
+    # ==================================
+    #   Save / load / export
+    # ==================================
+
     def save_to_backup(self, df: pd.DataFrame, uuid: str) -> str:
         # Load the timestamp format from the [Backup] section of the config
         timestamp_format = self.config.get('Backup', {}).get('timestamp_format', "%Y%m%d_%H%M%S")
-        backup_directory = os.path.expanduser(self.config.get('Backup', {}).get('backup_directory', '~/.config/cosmo/backups'))
-        timestamp = datetime.datetime.now().strftime(timestamp_format)
-        backup_filename = f"{backup_directory}/{uuid}_{timestamp}.xlsx"
-        if not os.path.exists(backup_directory):
-            os.makedirs(backup_directory)
-        df.to_excel(backup_filename, index=False)
+        now = datetime.datetime.now()
+        timestamp = now.strftime(timestamp_format)
+
+        uuid_directory = self.uuid_directory(uuid)
+        if not os.path.exists(uuid_directory):
+            os.makedirs(uuid_directory)
+
+        state = dict(zip(df["field_name"].tolist(), df["value"].astype(object).where(df["value"].notna(), None).tolist()))
+        index = self.load_index(uuid)
+
+        # Deltas since the last base; rebase when there is none or the chain got long
+        chain = 0
+        for entry in reversed(index):
+            if entry.get('kind', 'base') == 'base':
+                break
+            chain += 1
+        kind = 'delta' if index and chain + 1 < self.rebase_every else 'base'
+
+        data = {"kind": kind, "uuid": uuid, "timestamp": now.isoformat()}
+        if kind == 'base':
+            data.update(field_name=list(state), value=list(state.values()))
+        else:
+            previous = reconstruct(uuid_directory, index)
+            changed = {field: value for field, value in state.items() if field not in previous or previous[field] != value}
+            data.update(field_name=list(changed), value=list(changed.values()),
+                        removed=[field for field in previous if field not in state])
+
+        # Backups can land within the same second when taken before every fill
+        file_name = f"{uuid}_{timestamp}{BACKUP_SUFFIX}"
+        counter = 1
+        while os.path.exists(os.path.join(uuid_directory, file_name)):
+            counter += 1
+            file_name = f"{uuid}_{timestamp}_{counter}{BACKUP_SUFFIX}"
+        backup_filename = os.path.join(uuid_directory, file_name)
+        write_backup(backup_filename, data)
+
+        index.append({"file": file_name, "timestamp": now.isoformat(), "fields": len(data["field_name"]), "kind": kind})
+        self.save_index(uuid, index)
         return backup_filename
 
+    def state_at(self, uuid: str, at: datetime.datetime = None) -> pd.DataFrame:
+        """Rebuilds the backed-up state of `uuid` as of `at` (default: the latest backup)."""
+        index = self.load_index(uuid)
+        if at is not None:
+            index = [entry for entry in index if entry['timestamp'] <= at.isoformat()]
+        if not index:
+            return None
+        return state_frame(reconstruct(self.uuid_directory(uuid), index))
+
+    @staticmethod
+    def load_backup(file_name: str) -> pd.DataFrame:
+        """Reads a backup (base, delta or legacy .xlsx) into a field_name/value frame."""
+        if not file_name.endswith(BACKUP_SUFFIX):
+            return load_sheet(file_name)
+
+        data = read_backup(file_name)
+        if data.get("kind") != "delta":
+            return pd.DataFrame({"field_name": data["field_name"], "value": data["value"]})
+
+        # A delta on its own is partial; replay its chain up to and including it
+        directory = os.path.dirname(os.path.abspath(file_name))
+        index = load_index(directory)
+        position = next(i for i, entry in enumerate(index) if entry['file'] == os.path.basename(file_name))
+        return state_frame(reconstruct(directory, index[:position + 1]))
+
+    def export_xlsx(self, file_name: str, output_path: str = None) -> str:
+        """Writes a backup out as an .xlsx next to it (or to `output_path`)."""
+        if output_path is None:
+            output_path = file_name[:-len(BACKUP_SUFFIX)] + ".xlsx" if file_name.endswith(BACKUP_SUFFIX) else file_name
+        self.load_backup(file_name).to_excel(output_path, index=False)
+        return output_path
+
+    # ==================================
+    #   Compaction
+    # ==================================
+
+    def compact(self, uuid: str, keep: int = 5, before: datetime.datetime = None) -> int:
+        """Folds old backups into a single base and returns how many files were removed.
+
+        Everything older than the `keep` most recent backups (or, if `before` is
+        given, everything at or before that time) collapses into one base holding
+        the state at the newest folded backup. Later deltas stay valid because
+        each one is relative to the state just before it.
+        """
+        index = self.load_index(uuid)
+        if before is not None:
+            cutoff = max((i for i, entry in enumerate(index) if entry['timestamp'] <= before.isoformat()), default=-1)
+        else:
+            cutoff = len(index) - keep - 1
+        if cutoff < 1:
+            return 0 # Nothing to fold (zero or one backup at or before the cutoff)
+
+        uuid_directory = self.uuid_directory(uuid)
+        folded = index[:cutoff + 1]
+        state = reconstruct(uuid_directory, folded)
+        last = folded[-1]
+
+        # The new base replaces the newest folded file under the same name
+        write_backup(os.path.join(uuid_directory, last['file']), {
+            "kind": "base", "uuid": uuid, "timestamp": last['timestamp'],
+            "field_name": list(state), "value": list(state.values()),
+        })
+        self.save_index(uuid, [dict(last, kind="base", fields=len(state))] + index[cutoff + 1:])
+
+        for entry in folded[:-1]:
+            try:
+                os.remove(os.path.join(uuid_directory, entry['file']))
+            except FileNotFoundError:
+                pass
+        return len(folded) - 1
+
+
+def load_index(uuid_directory: str) -> list:
+    try:
+        with open(os.path.join(uuid_directory, 'index.json'), 'r') as index_file:
+            return json.load(index_file)
+    except (FileNotFoundError, ValueError):
+        return []
+
+
+def reconstruct(uuid_directory: str, index: list) -> dict:
+    """Folds the entries of `index` (oldest first) into a {field_name: value} state."""
+    start = max((i for i, entry in enumerate(index) if entry.get('kind', 'base') == 'base'), default=0)
+    state = {}
+    for entry in index[start:]:
+        data = read_backup(os.path.join(uuid_directory, entry['file']))
+        if data.get("kind") != "delta":
+            state = {}
+        for field in data.get("removed", []):
+            state.pop(field, None)
+        state.update(zip(data["field_name"], data["value"]))
+    return state
+
+
+def state_frame(state: dict) -> pd.DataFrame:
+    return pd.DataFrame({"field_name": list(state), "value": list(state.values())})
+
+
+def write_backup(path: str, data: dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as backup_file:
+        json.dump(data, backup_file, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_backup(path: str) -> dict:
+    with gzip.open(path, 'rt', encoding='utf-8') as backup_file:
+        return json.load(backup_file)
@@ -0,0 +1,116 @@
+import os
+import re
+import toml
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rich.console import Console
+from rich.progress import Progress
+from rich.table import Table
+from rich.box import SIMPLE_HEAD
+from .modules.session import connect, DEFAULT_DEBUGGER_ADDRESS
+from .modules.targets import switch_to_target
+
+# Set up console messages from the Rich library
+console = Console()
+
+# ==============================
+#  Manifest
+# ==============================
+#
+# A TOML file with one [[jobs]] table per (browser, sheet) pair:
+#
+#   [[jobs]]
+#   debugger = "127.0.0.1:9223"   # or: port = 9223
+#   tab = "CDwindow-1A2B..."      # optional window handle, or part of the modal title, inside that Chrome
+#   sheet = "~/sheets/bosnian.xlsx"
+
+def load_manifest(manifest_path: str) -> list:
+    manifest = toml.load(manifest_path)
+    jobs = []
+    for index, job in enumerate(manifest.get("jobs", [])):
+        if "sheet" not in job:
+            raise ValueError(f"Job {index + 1} in {manifest_path} has no 'sheet'.")
+        if "port" in job:
+            debugger = f"127.0.0.1:{job['port']}"
+        else:
+            debugger = job.get("debugger", DEFAULT_DEBUGGER_ADDRESS)
+        jobs.append({
+            "name": job.get("name") or os.path.splitext(os.path.basename(job["sheet"]))[0],
+            "debugger": debugger,
+            "tab": job.get("tab"),
+            "sheet": os.path.expanduser(job["sheet"]),
+        })
+    return jobs
+
+# ==============================
+#  Workers
+# ==============================
+
+def _run_job(job: dict, on_conflict: str, on_progress, connect_browser) -> dict:
+    from .fill import CosmoFiller
+
+    # Each worker owns its session, so switching tabs never races another worker
+    browser = connect_browser(job["debugger"])
+    if job["tab"] and not switch_to_target(browser, job["tab"]):
+        raise ValueError(f"No open tab or modal matches '{job['tab']}'")
+
+    cosmo = CosmoFiller(browser=browser)
+    label = re.sub(r"[^A-Za-z0-9_-]+", "-", job["name"])
+    try:
+        return cosmo.batch_fill(job["sheet"], on_conflict=on_conflict, on_progress=on_progress, label=label)
+    finally:
+        # The history connection belongs to this worker thread; close it here rather than at exit
+        cosmo.change_logger.close()
+
+
+def _row_count(sheet: str):
+    from .modules.sheets import load_sheet
+    try:
+        return len(load_sheet(sheet))
+    except Exception:
+        return None # The worker reports the real error
+
+
+def run_batch(jobs: list, workers: int = None, on_conflict: str = "s", connect_browser=connect) -> list:
+    """Fills every job concurrently and returns one result dict per job, in manifest order."""
+    results = [None] * len(jobs)
+
+    with Progress(console=console) as progress:
+        # Parse up front so each bar has a real total (and the workers hit the sheet cache)
+        tasks = [progress.add_task(f"[cyan]{job['name']}", total=_row_count(job["sheet"])) for job in jobs]
+
+        with ThreadPoolExecutor(max_workers=workers or len(jobs) or 1) as pool:
+            futures = {}
+            for index, job in enumerate(jobs):
+                advance = lambda count, task=tasks[index]: progress.update(task, advance=count)
+                futures[pool.submit(_run_job, job, on_conflict, advance, connect_browser)] = index
+
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = {"job": jobs[index], "counts": future.result(), "error": None}
+                    progress.update(tasks[index], description=f"[green]{jobs[index]['name']}")
+                except Exception as error:
+                    results[index] = {"job": jobs[index], "counts": None, "error": str(error)}
+                    progress.update(tasks[index], description=f"[red]{jobs[index]['name']}")
+
+    return results
+
+
+def display_batch_summary(results: list):
+    table = Table(show_header=True, box=SIMPLE_HEAD)
+    table.add_column("Job")
+    table.add_column("Debugger")
+    for column in ("Filled", "Overwritten", "Appended", "Skipped", "Unchanged", "Missing"):
+        table.add_column(column, justify="right")
+    table.add_column("Status")
+
+    for result in results:
+        job, counts = result["job"], result["counts"]
+        if counts is None:
+            table.add_row(job["name"], job["debugger"], *[""] * 6, f"[red]{result['error']}")
+        else:
+            table.add_row(job["name"], job["debugger"],
+                          *(str(counts[key]) for key in ("filled", "overwritten", "appended", "skipped", "unchanged", "missing")),
+                          "[green]done")
+
+    console.print(table)
@@ -1,74 +1,140 @@
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+import re
+import difflib
 from rich.console import Console
 from rich.text import Text
+from .modules.snapshot import snapshot_values
+from .modules.session import get_browser
+from .modules.writer import _as_text
+from .modules.sheets import load_or_report
+from .modules.plan import ChangePlan, FILL, CONFLICT, MISSING
+from .modules import profiler
 
 # Set up console messages from the Rich library
 console = Console()
 
-def generate_diff(original: str, modified: str) -> Text:
+# ==========================================
+#   Diff engine
+#   Trims the common prefix/suffix, then runs
+#   difflib over just the changed middle.
+# ==========================================
+
+GRANULARITIES = ("char", "word", "line")
+
+# Tokens (after trimming) above which a diff falls back to a coarser
+# granularity, and finally to showing the changed middle as a single block.
+MAX_DIFF_TOKENS = 4000
+
+_WORD_PATTERN = re.compile(r"\s+|\w+|[^\w\s]")
+
+
+def tokenize(text: str, granularity: str = "char") -> list:
+    if granularity == "word":
+        return _WORD_PATTERN.findall(text)
+    if granularity == "line":
+        return text.splitlines(keepends=True)
+    return list(text)
+
+
+def _common_prefix(a: list, b: list) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _common_suffix(a: list, b: list, prefix: int) -> int:
+    n = min(len(a), len(b)) - prefix
+    i = 0
+    while i < n and a[-1 - i] == b[-1 - i]:
+        i += 1
+    return i
+
+
+def diff_opcodes(original: str, modified: str, granularity: str = "char", max_tokens: int = MAX_DIFF_TOKENS) -> list:
+    """Returns (tag, original_text, modified_text) runs that turn `original` into `modified`.
+
+    `tag` is one of difflib's 'equal', 'replace', 'delete' or 'insert'.
+    """
+    if original == modified:
+        return [("equal", original, modified)] if original else []
+
+    a, b = tokenize(original, granularity), tokenize(modified, granularity)
+    prefix = _common_prefix(a, b)
+    suffix = _common_suffix(a, b, prefix)
+    a_mid, b_mid = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+
+    runs = []
+    if prefix:
+        runs.append(("equal", "".join(a[:prefix]), "".join(b[:prefix])))
+
+    if len(a_mid) + len(b_mid) <= max_tokens:
+        matcher = difflib.SequenceMatcher(None, a_mid, b_mid, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            runs.append((tag, "".join(a_mid[i1:i2]), "".join(b_mid[j1:j2])))
+    elif granularity != "line":
+        # Too long to diff finely; retry the changed middle one step coarser
+        coarser = GRANULARITIES[GRANULARITIES.index(granularity) + 1]
+        runs.extend(diff_opcodes("".join(a_mid), "".join(b_mid), coarser, max_tokens))
+    else:
+        runs.append(("replace", "".join(a_mid), "".join(b_mid)))
+
+    if suffix:
+        runs.append(("equal", "".join(a[len(a) - suffix:]), "".join(b[len(b) - suffix:])))
+    return runs
+
+
+def generate_diff(original, modified, granularity: str = "char") -> Text:
+    """Renders removed text in red and inserted text in green, unchanged text plain."""
     diff_text = Text()
-    
-    for o, m in zip(original, modified):
-        if o == m:
-            diff_text.append(o)
+
+    for tag, original_part, modified_part in diff_opcodes(_as_text(original), _as_text(modified), granularity):
+        if tag == "equal":
+            diff_text.append(original_part)
         else:
-            diff_text.append(o, "red")
-            diff_text.append(m, "green")
-
-    # Append any remaining characters
-    if len(original) < len(modified):
-        diff_text.append(modified[len(original):], "green")
-    elif len(original) > len(modified):
-        diff_text.append(original[len(modified):], "red")
-    
+            diff_text.append(original_part, "red")
+            diff_text.append(modified_part, "green")
+
     return diff_text
 
-def display_differences(filename: str) -> dict:
-    # Read data from an Excel or CSV file
-    file_ext = filename.split('.')[-1]
-    if file_ext == 'xlsx':
-        dataFrame = pd.read_excel(filename)
-    elif file_ext == 'csv':
-        dataFrame = pd.read_csv(filename)
-    else:
-        console.print("[red]Unsupported file format. Please provide an Excel or CSV file.[/red]")
+def display_differences(filename: str, browser=None, granularity: str = "char", sheet: str = None) -> dict:
+    dataFrame = load_or_report(filename, sheet, console)
+    if dataFrame is None:
         return
 
-    # Connect to existing Chrome session
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-    browser = webdriver.Chrome(options=chrome_options)
-
-    mismatches = {}
+    if browser is None:
+        browser = get_browser()
 
-    for index, row in dataFrame.iterrows():
-        field_name = row.iloc[0]
-        value = row.iloc[1]
+    # Read every field on the page in one round trip and classify every row
+    plan = ChangePlan.build(dataFrame, snapshot_values(browser))
 
-        try:
-            input_element = browser.find_element(By.XPATH, f"//*[@name='{field_name}']")
-            current_value = input_element.get_attribute('value')
+    return display_plan_differences(plan, granularity)
 
-            if current_value != value:
-                mismatches[field_name] = {
-                    "excel_value": value,
-                    "web_value": current_value
-                }
-                diff_content = generate_diff(value, current_value)
-                console.print(f"[yellow]Diff for field {field_name}:[/yellow]")
-                console.print(diff_content)
+@profiler.profiled("diff.render")
+def display_plan_differences(plan: ChangePlan, granularity: str = "char") -> dict:
+    mismatches = {}
 
-        except NoSuchElementException:
+    # The plan already compared every row in one pass; only rows that differ get diffed
+    for field_name, value, current_value, status in plan.rows(FILL, CONFLICT, MISSING).itertuples(index=False):
+        if status == MISSING:
             console.print(f"[red]Field with name {field_name} not found on the page![/red]")
 
+        else:
+            mismatches[field_name] = {
+                "excel_value": value,
+                "web_value": current_value
+            }
+            with profiler.span("diff.compute"):
+                diff_content = generate_diff(value, current_value, granularity)
+            console.print(f"[yellow]Diff for field {field_name}:[/yellow]")
+            console.print(diff_content)
+
     return mismatches
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Display differences between data on the webpage and the Excel or CSV file.')
     parser.add_argument('-f', '--file', required=True, help='Path to the Excel or CSV file with data.')
+    parser.add_argument('-g', '--granularity', choices=GRANULARITIES, default='char', help='Compare by character, word or line.')
     args = parser.parse_args()
-    display_differences(args.file)
\ No newline at end of file
+    display_differences(args.file, granularity=args.granularity)
\ No newline at end of file
@@ -4,21 +4,29 @@
 # =================================
 
 import os
-import datetime
 import argparse
+import contextlib
 import pandas as pd
 
-from   selenium import webdriver
 from   selenium.webdriver.common.by   import By
 from   selenium.common.exceptions     import NoSuchElementException
-from   selenium.webdriver.common.keys import Keys
 
 from   rich             import print
 from   rich.panel       import Panel
 from   rich.console     import Console
 from   rich.progress    import Progress
+from   rich.table       import Table
+from   rich.box         import SIMPLE_HEAD
 from   .history         import History
 from   .modules.logger  import CosmoLogger
+from   .modules.snapshot import snapshot_values
+from   .modules.writer  import write_values
+from   .modules.session import get_browser, DEFAULT_DEBUGGER_ADDRESS
+from   .modules.sheets  import load_sheet, load_or_report, report_sheet_error, UnsupportedFileError, SheetNotFoundError
+from   .modules.plan    import ChangePlan, UNCHANGED, FILL, CONFLICT, MISSING, row_fingerprints
+from   .modules         import profiler
+from   .modules.stream  import stream_sheet, estimate_rows
+from   .modules.conflicts import ConflictPolicy, ConflictRuleError, parse_selection
 from   .version_control import VersionControl
 
 
@@ -27,11 +35,9 @@ from   .version_control import VersionControl
 # =======================
 class CosmoFiller:
 
-    def __init__(self):
+    def __init__(self, browser=None, debugger_address: str = DEFAULT_DEBUGGER_ADDRESS):
         self.console = Console()
-        self.chrome_options = webdriver.ChromeOptions()
-        self.chrome_options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-        self.browser = webdriver.Chrome(options=self.chrome_options)
+        self.browser = browser if browser is not None else get_browser(debugger_address) # Shared Chrome debugging session
         self.change_logger = History() # Change database for History operations
         self.logger = CosmoLogger() # Fill Logs
 
@@ -42,23 +48,60 @@ class CosmoFiller:
         except NoSuchElementException:
             return ""
     
+    def get_form_uuid(self):
+        title = self.get_modal_title()
+        parts = title.split(' ')
+        return parts[2] if len(parts) > 2 else None  # Assuming format "Translations for UUID customerID"
+
     def backup_data(self, field_names: pd.DataFrame) -> pd.DataFrame:
-        field_data = []
-        for _, row in field_names.iterrows():
-            field_name = row.iloc[0]  # Grab field name from the *first* column 
-            try:
-                input_element = self.browser.find_element(By.NAME, field_name)
-                current_value = input_element.get_attribute('value')
-                field_data.append([field_name, current_value])
-            except NoSuchElementException:
-                field_data.append([field_name, None])
+        page_values = snapshot_values(self.browser) # One round trip for every field on the page
+        field_column = field_names.iloc[:, 0]  # Grab field names from the *first* column
+        values = [page_values.get(field_name) for field_name in field_column]
 
-        return pd.DataFrame(field_data, columns=["field_name", "value"])
+        return pd.DataFrame({"field_name": field_column.values, "value": values})
 
 
-    def autofill(self, filename: str = None, backup: bool = False):
+    @contextlib.contextmanager
+    def _recording(self, label: str = None):
+        """Starts a history run and a log file; both are written out even if the fill fails partway."""
+        self.change_logger.start_run()
+        self.logger.start(label)
+        try:
+            yield
+        finally:
+            self.change_logger.flush() # Commit the run's history in one transaction
+            self.logger.close()
+
+    def _open_rows(self, filename: str, sheet: str = None, stream: bool = False):
+        """(estimated row count, chunks of rows) for a fill; the whole sheet is one chunk unless
+        streaming. Prints the problem and returns None for an unsupported file or unknown sheet."""
+        if not stream:
+            dataFrame = load_or_report(filename, sheet, self.console)
+            return None if dataFrame is None else (len(dataFrame), [dataFrame])
+        try:
+            # Parsed chunk by chunk on a background thread; writing starts with the first chunk
+            return estimate_rows(filename, sheet), stream_sheet(filename, sheet=sheet)
+        except (UnsupportedFileError, SheetNotFoundError) as e:
+            report_sheet_error(e, self.console)
+            return None
+
+    @staticmethod
+    def _settle_progress(progress, task, rows_seen: int):
+        # The streamed total was an estimate; settle on the real count
+        progress.update(task, total=rows_seen, completed=rows_seen)
+        progress.refresh()
+
+    def sheet_key(self, filename: str, sheet: str = None) -> str:
+        """Stable identity for a sheet: the staged name for the staged file, else its absolute path.
+        A named sheet of a workbook gets '#<sheet>' appended."""
+        vc = VersionControl()
+        if vc.filename and os.path.abspath(filename) == os.path.abspath(vc.filename):
+            key = "staged:" + (vc.staged_name() or os.path.basename(filename))
+        else:
+            key = os.path.abspath(filename)
+        return f"{key}#{sheet}" if sheet else key
 
-        log_entries = []
+    def autofill(self, filename: str = None, backup: bool = False, incremental: bool = False, stream: bool = False, sheet: str = None, defer: bool = False):
 
         if not filename:
             vc = VersionControl()
@@ -67,154 +110,219 @@ class CosmoFiller:
                 self.console.print("[red]No staged file found. Please stage a file using 'cosmo stage -f <excel file>' or provide a file directly.[/red]")
                 return
         
-        file_ext = filename.split('.')[-1]
-        if file_ext == 'xlsx':
-            dataFrame = pd.read_excel(filename)
-        elif file_ext == 'csv':
-            dataFrame = pd.read_csv(filename)
-        else:
-            self.console.print("[red]Unsupported file format. Please provide an Excel or CSV file.[/red]")
+        opened = self._open_rows(filename, sheet, stream)
+        if opened is None:
             return
+        total_rows, chunks = opened
+
+        browser = self.browser
 
-        # Connect to Chrome debugging session
-        chrome_options = webdriver.ChromeOptions()
-        chrome_options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-        browser = webdriver.Chrome(options=chrome_options)
+        # Deferred mode queues conflicts instead of prompting; rules and one review screen settle them at the end
+        deferred = [] if defer else None
+        if defer:
+            try:
+                policy = ConflictPolicy.from_config()
+            except ConflictRuleError as e:
+                self.console.print(f"[red]{e}[/red]")
+                return
 
         # ====================================================
         # Backup files (if a backup is specified in the CLI)
         # ====================================================
         if backup:
-            self.backup_data(dataFrame)
-
-
-        # Logging setup
-        log_entry = [
-            {
-                "action": "Modified",
-                "field_name": "Field1",
-                "prev_value": "old_value",
-                "new_value": "new_value"
-            }
-        ]
+            uuid = self.get_form_uuid()
+            if uuid:
+                from .backup import BackupControl
+                # A streamed sheet is never fully in memory, so back up every field on the page instead
+                field_names = pd.DataFrame({"field_name": list(snapshot_values(browser))}) if stream else chunks[0]
+                with profiler.span("fill.backup"):
+                    backup_filename = BackupControl().save_to_backup(self.backup_data(field_names), uuid)
+                self.console.print(f"[yellow]Backup saved to {backup_filename}![/yellow]")
+            else:
+                self.console.print("[red]Could not read the form's UUID from the modal title; skipping the backup.[/red]")
+
+
+        # ==================================================
+        #   Incremental mode: only rows changed since the
+        #   last run against this same form are considered
+        # ==================================================
+        sheet_key = self.sheet_key(filename, sheet)
+        form_key = self.get_modal_title()
+        check_previous = False
+
+        if incremental:
+            check_previous = bool(form_key) and self.change_logger.has_applied(sheet_key, form_key)
+            if not check_previous:
+                self.console.print("[yellow]No previous run recorded for this sheet and form; doing a full pass.[/yellow]")
 
         apply_to_all_choice = None  # Store the 'apply to all' choice in a variable
-
-
-        # ==================================
-        #   Main data processing block
-        # ==================================
-        with Progress(console=self.console, auto_refresh=False) as progress:
-            task = progress.add_task("[cyan]Filling form...[/cyan]", total=dataFrame.shape[0])
-
-            for index, row in dataFrame.iterrows():
-                choice = ""
-                field_name = row.iloc[0]
-                value = row.iloc[1]
-                #timestamp = datetime.datetime.now().isoformat() # TODO: Remove
-
-                # Initialize log_entry with default values
-                log_entry = {
-                    "action": "Unknown",
-                    "field_name": field_name,
-                    "prev_value": None,
-                    "new_value": None
-                }
-
-                try:
-                    input_element = browser.find_element(By.XPATH, f"//*[@name='{field_name}']")
-                    current_value = input_element.get_attribute('value')
-                    log_entry["prev_value"] = current_value  # Update the previous value
-
-
-                    if current_value == value:
-                        self.console.print(f"Field [yellow]{field_name}[/yellow] already has the same value. Skipping...")
+        rows_seen = rows_changed = 0
+
+        with self._recording(): # One history run and one streamed log file for this fill
+            # Read every field on the page once. Each chunk of rows (the whole sheet
+            # unless streaming) is classified against it and written in bulk.
+            page_values = snapshot_values(browser)
+
+
+            # ==================================
+            #   Main data processing block
+            # ==================================
+            with profiler.span("fill.rows", rows=total_rows), Progress(console=self.console, auto_refresh=False) as progress:
+                task = progress.add_task("[cyan]Filling form...[/cyan]", total=total_rows)
+
+                for chunk in chunks:
+                    fingerprints = row_fingerprints(chunk)
+                    rows_seen += len(chunk)
+
+                    if check_previous:
+                        field_column = chunk.iloc[:, 0].astype(str)
+                        previous = self.change_logger.applied_fingerprints(sheet_key, form_key, field_column)
+                        changed = fingerprints.to_numpy() != field_column.map(previous).to_numpy()
+                        rows_changed += int(changed.sum())
+                        progress.update(task, advance=len(chunk) - int(changed.sum())) # Unchanged rows count as done
+                        chunk, fingerprints = chunk[changed], fingerprints[changed]
+
+                    plan = ChangePlan.build(chunk, page_values)
+                    pending_writes = {}
+                    applied = set()  # Fields the page will hold the sheet value for once this chunk is written
+
+                    for field_name, value, current_value, status in plan.frame.itertuples(index=False):
+                        choice = ""
+
+                        # Default log values for this field
+                        action = "Unknown"
+                        new_value = None
+
+                        if status == UNCHANGED:
+                            applied.add(field_name)
+                            self.console.print(f"Field [yellow]{field_name}[/yellow] already has the same value. Skipping...")
+
+                        elif status == CONFLICT and deferred is not None:
+                            # Queued; logged once it is resolved after the pass
+                            progress.update(task, advance=1)
+                            continue
+
+                        # ==================================================
+                        #     Handling options for data that doesn't 
+                        #              match our excel sheet.
+                        # =================================================
+
+                        elif status == CONFLICT:
+
+                            if not apply_to_all_choice: # or apply_to_all_choice == "o":
+                                progress.stop()
+                                self.console.print("\n")
+                                self.console.print(Panel(f"""[reverse red] WARNING: Mismatch in field {field_name} [/reverse red]\n\n[red]Webpage value: {current_value}[/red]\n[yellow]Spreadsheet value: {value}[/yellow]\n\nChoose an action:\n - [blue]s[/blue] = skip\n - [yellow]a[/yellow] = append\n - [magenta]o[/magenta] = overwrite\n - Add [light_slate_blue]all[/light_slate_blue] to any option to apply to all (ex: "[magenta]o[/magenta] [light_slate_blue]all[/light_slate_blue]" to overwrite all.)                                            
+                                            """, expand=True))
+                                with profiler.span("fill.prompt"): # Time spent waiting on the user
+                                    choice = input()
+                                choice = choice.strip().lower()
+
+                                if choice.endswith(" all"):
+                                    apply_to_all_choice = choice[0]
+                                else:
+                                    apply_to_all_choice = None
                     
-                    # ==================================================
-                    #     Handling options for data that doesn't 
-                    #              match our excel sheet.
-                    # =================================================
-
-                    elif current_value is not None and current_value.strip() != "":
-
-                        if not apply_to_all_choice: # or apply_to_all_choice == "o":
-                            progress.stop()
-                            self.console.print("\n")
-                            self.console.print(Panel(f"""[reverse red] WARNING: Mismatch in field {field_name} [/reverse red]\n\n[red]Webpage value: {current_value}[/red]\n[yellow]Spreadsheet value: {value}[/yellow]\n\nChoose an action:\n - [blue]s[/blue] = skip\n - [yellow]a[/yellow] = append\n - [magenta]o[/magenta] = overwrite\n - Add [light_slate_blue]all[/light_slate_blue] to any option to apply to all (ex: "[magenta]o[/magenta] [light_slate_blue]all[/light_slate_blue]" to overwrite all.)                                            
-                                        """, expand=True))
-                            choice = input()
-                            choice = choice.strip().lower()
-
-                            if choice.endswith(" all"):
-                                apply_to_all_choice = choice[0]
-                            else:
-                                apply_to_all_choice = None
-                        
-                        choice = apply_to_all_choice if apply_to_all_choice else choice
-
-                        
-                        # ================================
-                        # Handle each option at the prompt
-                        # ================================
-                        if choice == "s":
-                            log_entry["action"] = "Skipped"
-                            self.console.print(f"[green]Skipped {field_name}.[/green]")
-                            self.change_logger.add(field_name, "skip", current_value, value) # Database Entry
-
-
-
-                        elif choice == "a":
-                            self.console.print(f"[gold1]Appending [magenta]{value}[/magenta] to [navajo_white1]'{current_value}'[/navajo_white1]...[/gold1]")
-                            newValue = current_value + value
-                            input_element.send_keys(value)  # Directly append the value without clearing the field.
-                            self.console.print(f"[gold1]Appended [magenta]{value}[/magenta] to the [navajo_white1]'{field_name}'[/navajo_white1] field.[/gold1] -- new value is {newValue}")
-                            log_entry["action"] = "Appended"
-                            log_entry["new_value"] = newValue 
-                            self.change_logger.add(field_name, "append", current_value, newValue) # Database Entry
-
-
-                        elif choice == "o":
-                            input_element.send_keys(Keys.COMMAND, 'a')
-                            input_element.send_keys(value)
-                            self.console.print(f"[green]Successfully overwrote the [yellow]'{field_name}'[/yellow] field.[/green]")                            
-                            log_entry["action"] = "Overwrote"
-                            log_entry["new_value"] = value
-                            self.change_logger.add(field_name, "overwrite", current_value, value)
+                            choice = apply_to_all_choice if apply_to_all_choice else choice
 
                     
-                    # =============================================
-                    # Populate field if no mismatches are detected.
-                    # =============================================
-
-                    else:
-                        input_element.send_keys(value)
-                        log_entry["action"] = "Filled"
-                        log_entry["new_value"] = value
-                        self.console.print(f"[green]Filled the [yellow]'{field_name}'[/yellow] field with value [cyan]{value}[/cyan].[/green]")
-
-                    # ===========================================
-                    # Start Progress after Handling Current Field
-                    # ===========================================
-                    
-                    progress.start()
-
-                except NoSuchElementException:
-                    log_entry["action"] = "Field Not Found"
-                    log_entry["new_value"] = value
-                    self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]not found on the page![/red]")
+                            # ================================
+                            # Handle each option at the prompt
+                            # ================================
+                            if choice == "s":
+                                action = "Skipped"
+                                self.console.print(f"[green]Skipped {field_name}.[/green]")
+                                self.change_logger.add(field_name, "skip", current_value, value) # Database Entry
+
+
+
+                            elif choice == "a":
+                                self.console.print(f"[gold1]Appending [magenta]{value}[/magenta] to [navajo_white1]'{current_value}'[/navajo_white1]...[/gold1]")
+                                newValue = current_value + value
+                                pending_writes[field_name] = newValue  # Existing value followed by the new one
+                                self.console.print(f"[gold1]Appended [magenta]{value}[/magenta] to the [navajo_white1]'{field_name}'[/navajo_white1] field.[/gold1] -- new value is {newValue}")
+                                action = "Appended"
+                                new_value = newValue 
+                                self.change_logger.add(field_name, "append", current_value, newValue) # Database Entry
+
+
+                            elif choice == "o":
+                                pending_writes[field_name] = value
+                                applied.add(field_name)
+                                self.console.print(f"[green]Successfully overwrote the [yellow]'{field_name}'[/yellow] field.[/green]")                            
+                                action = "Overwrote"
+                                new_value = value
+                                self.change_logger.add(field_name, "overwrite", current_value, value)
+
+                            # ===========================================
+                            # Start Progress after Handling Current Field
+                            # ===========================================
+
+                            progress.start()
+
+                        # =============================================
+                        # Populate field if no mismatches are detected.
+                        # =============================================
+
+                        elif status == FILL:
+                            pending_writes[field_name] = value
+                            applied.add(field_name)
+                            action = "Filled"
+                            new_value = value
+                            self.console.print(f"[green]Filled the [yellow]'{field_name}'[/yellow] field with value [cyan]{value}[/cyan].[/green]")
+
+                        else: # MISSING
+                            action = "Field Not Found"
+                            new_value = value
+                            self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]not found on the page![/red]")
                 
-                # Append to logs at the end of each iteration:
-                log_entries.append(log_entry)
-
-                # Update the progress bar at the end of each iteration
-                progress.update(task, advance=1)
-                progress.refresh()
+                        # Log at the end of each iteration:
+                        self.logger.log(action, field_name, current_value, new_value)
+
+                        # Update the progress bar at the end of each iteration
+                        progress.update(task, advance=1)
+                        progress.refresh()
+                        profiler.count("progress.refresh")
+
+                    # ==================================
+                    #   Send the chunk's writes at once
+                    # ==================================
+
+                    if pending_writes:
+                        progress.update(task, description=f"[cyan]Writing {len(pending_writes)} fields...[/cyan]")
+                        progress.refresh()
+                        missing = write_values(browser, pending_writes)
+                        progress.update(task, description="[cyan]Filling form...[/cyan]")
+                        for field_name in missing:
+                            applied.discard(field_name)
+                            self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]disappeared before it could be written![/red]")
+
+                    if deferred is not None:
+                        conflicts = (plan.frame["status"] == CONFLICT).to_numpy()
+                        if conflicts.any():
+                            deferred.append(plan.frame[conflicts].assign(fingerprint=fingerprints.to_numpy()[conflicts]))
+
+                    # Remember what this form now holds so the next --incremental run can skip it
+                    if form_key:
+                        self.change_logger.record_applied(sheet_key, form_key, {
+                            field_name: fingerprint
+                            for field_name, fingerprint in zip(plan.frame["field_name"], fingerprints)
+                            if field_name in applied
+                        })
+
+                self._settle_progress(progress, task, rows_seen)
+
+            if deferred:
+                self.apply_deferred(pd.concat(deferred, ignore_index=True), policy, sheet_key, form_key)
+
+            if check_previous:
+                self.console.print(f"[cyan]Incremental fill: {rows_changed} of {rows_seen} rows changed since the last run on '{form_key}'.[/cyan]")
 
         # ==================================
         #       Write output to logs
         # ==================================
 
-        self.logger.write_log(log_entries)
+        self.console.print(f"Log saved to {self.logger.log_path}")
 
         # ==============================================================
         # Print the below message when the form is finished completing.
@@ -223,6 +331,153 @@ class CosmoFiller:
         self.console.print("Form filling completed!")
 
 
+    # =============================================
+    #   Deferred conflicts (fill --defer)
+    # =============================================
+
+    def review_conflicts(self, conflicts: pd.DataFrame) -> list:
+        """Shows every conflict in one table and reads choices for all of them. Returns s/a/o per row.
+
+        Each line is an action and a selection ("o 1-3,7", "a 4", "s all",
+        "o rest"); an empty line finishes, and anything still open is skipped.
+        """
+        table = Table(show_header=True, box=SIMPLE_HEAD)
+        table.add_column("#", justify="right")
+        table.add_column("Field")
+        table.add_column("Webpage Value")
+        table.add_column("Spreadsheet Value")
+        for position, (field_name, value, current_value) in enumerate(
+                conflicts[["field_name", "sheet_value", "page_value"]].itertuples(index=False), start=1):
+            table.add_row(str(position), field_name, f"[red]{current_value}[/red]", f"[yellow]{value}[/yellow]")
+
+        self.console.print(Panel(f"[reverse red] {len(conflicts)} fields hold a different value [/reverse red]", expand=True))
+        self.console.print(table)
+        self.console.print("""Choose an action and the rows it applies to, one per line:
+ - [blue]s[/blue] = skip, [yellow]a[/yellow] = append, [magenta]o[/magenta] = overwrite
+ - Rows are numbers and ranges ("[magenta]o[/magenta] 1-3,7"), [light_slate_blue]all[/light_slate_blue], or [light_slate_blue]rest[/light_slate_blue] for those not chosen yet
+ - An empty line finishes; rows left without a choice are skipped""")
+
+        choices = [None] * len(conflicts)
+        while None in choices:
+            with profiler.span("fill.prompt"): # Time spent waiting on the user
+                line = input().strip().lower()
+            if not line:
+                break
+
+            choice, _, selection = line.partition(" ")
+            if choice not in ("s", "a", "o"):
+                self.console.print(f"[red]Unknown action '{choice}'. Use s, a or o.[/red]")
+                continue
+            try:
+                if selection.strip() == "rest":
+                    positions = [position for position, chosen in enumerate(choices) if chosen is None]
+                else:
+                    positions = parse_selection(selection, len(choices))
+            except ValueError as e:
+                self.console.print(f"[red]Could not read rows '{selection}': {e}[/red]")
+                continue
+
+            for position in positions:
+                choices[position] = choice
+            self.console.print(f"[green]{len(positions)} row(s) set; {choices.count(None)} still open.[/green]")
+
+        return [choice or "s" for choice in choices]
+
+    def choose_conflicts(self, conflicts: pd.DataFrame, policy: ConflictPolicy) -> pd.Series:
+        """Picks s/a/o for each conflict row: by rule where one matches, on one review screen for the rest."""
+        choices = policy.resolve(conflicts["field_name"]) if policy else pd.Series(None, index=conflicts.index, dtype=object)
+        by_rule = int(choices.notna().sum())
+        if by_rule:
+            self.console.print(f"[cyan]{by_rule} of {len(conflicts)} conflicts resolved by rules in config.toml.[/cyan]")
+
+        open_rows = choices.isna()
+        if open_rows.any():
+            choices[open_rows] = self.review_conflicts(conflicts[open_rows])
+        return choices
+
+    def apply_deferred(self, conflicts: pd.DataFrame, policy: ConflictPolicy, sheet_key: str = None, form_key: str = None):
+        """Settles queued conflicts by rule, then on one review screen, and writes the result in one bulk call."""
+        choices = self.choose_conflicts(conflicts, policy)
+
+        pending_writes = {}
+        applied = {}
+        for (field_name, value, current_value, _, fingerprint), choice in zip(conflicts.itertuples(index=False), choices):
+            if choice == "o":
+                action, new_value, kind = "Overwrote", value, "overwrite"
+                pending_writes[field_name] = value
+                applied[field_name] = fingerprint
+            elif choice == "a":
+                action, new_value, kind = "Appended", current_value + value, "append"
+                pending_writes[field_name] = new_value
+            else:
+                action, new_value, kind = "Skipped", None, "skip"
+            self.change_logger.add(field_name, kind, current_value, value if new_value is None else new_value)
+            self.logger.log(action, field_name, current_value, new_value)
+
+        with self.console.status(f"[bold blue]Writing {len(pending_writes)} fields...", spinner="dots2"):
+            missing = write_values(self.browser, pending_writes)
+        for field_name in missing:
+            applied.pop(field_name, None)
+            self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]disappeared before it could be written![/red]")
+
+        counts = pd.Series(choices).value_counts()
+        self.console.print(f"[green]Conflicts: {int(counts.get('o', 0))} overwritten, {int(counts.get('a', 0))} appended, {int(counts.get('s', 0))} skipped.[/green]")
+
+        if form_key and applied:
+            self.change_logger.record_applied(sheet_key, form_key, applied)
+
+
+    # =============================================
+    #   Non-interactive fill (used by fill-batch)
+    # =============================================
+
+    def batch_fill(self, filename: str, on_conflict: str = "s", on_progress=None, label: str = None) -> dict:
+        """Fills the page without prompting. Conflicts follow the config.toml rules, then `on_conflict` (s/a/o).
+
+        Prints nothing; returns a count per outcome. `on_progress(n)` is called as rows are handled.
+        """
+        on_progress = on_progress or (lambda count: None)
+        dataFrame = load_sheet(filename)
+        plan = ChangePlan.build(dataFrame, snapshot_values(self.browser))
+        policy = ConflictPolicy.from_config()
+        choices = policy.resolve(plan.frame["field_name"]).fillna(on_conflict) if policy else [on_conflict] * len(plan)
+
+        with self._recording(label):
+            counts = {"unchanged": 0, "filled": 0, "appended": 0, "overwritten": 0, "skipped": 0, "missing": 0}
+            pending_writes = {}
+
+            for (field_name, value, current_value, status), choice in zip(plan.frame.itertuples(index=False), choices):
+                new_value = None
+
+                if status == UNCHANGED:
+                    action, key = "Unknown", "unchanged"
+                elif status == MISSING:
+                    action, key, new_value = "Field Not Found", "missing", value
+                elif status == FILL:
+                    action, key, new_value = "Filled", "filled", value
+                    pending_writes[field_name] = value
+                elif choice == "o":
+                    action, key, new_value = "Overwrote", "overwritten", value
+                    pending_writes[field_name] = value
+                    self.change_logger.add(field_name, "overwrite", current_value, value)
+                elif choice == "a":
+                    new_value = current_value + str(value)
+                    action, key = "Appended", "appended"
+                    pending_writes[field_name] = new_value
+                    self.change_logger.add(field_name, "append", current_value, new_value)
+                else:
+                    action, key = "Skipped", "skipped"
+                    self.change_logger.add(field_name, "skip", current_value, value)
+
+                counts[key] += 1
+                self.logger.log(action, field_name, current_value, new_value)
+
+            # Rows that need no write count as done straight away; the rest advance per chunk
+            on_progress(len(plan) - len(pending_writes))
+            counts["missing"] += len(write_values(self.browser, pending_writes, on_chunk=on_progress))
+        return counts
+
+
     # ===============
     #     Revert
     # ===============
@@ -243,92 +498,188 @@ class CosmoFiller:
             if not os.path.exists(file_name):
                 return False
 
-            # Load the backup data
-            backup_df = pd.read_excel(file_name).fillna("")  # Replace NaN with blank strings
-
-            # Connect to the web browser session
-            chrome_options = webdriver.ChromeOptions()
-            chrome_options.add_experimental_option("debuggerAddress", "127.0.0.1:9222")
-            browser = webdriver.Chrome(options=chrome_options)
+            from .backup import BackupControl
 
-            # Revert fields based on backup data
-            for index, row in backup_df.iterrows():
-                field_name = row["field_name"]
-                previous_value = row["value"]
+            # Load the backup data (columnar .json.gz, or a legacy .xlsx)
+            self.revert_data(BackupControl.load_backup(file_name))
 
-                try:
-                    input_element = browser.find_element(By.XPATH, f"//*[@name='{field_name}']")
-                    input_element.send_keys(Keys.COMMAND, 'a')  # Clear the current value
-                    input_element.send_keys(previous_value)  # Populate with backup value
-                except NoSuchElementException:
-                    # Handle the situation when the field is not found. This could be a print or log statement.
-                    pass
+        return True
 
-            # Close the browser session or keep it open based on your requirement
-            # browser.quit()
+    def revert_data(self, backup_df: pd.DataFrame):
+        backup_df = backup_df.fillna("")  # Replace NaN with blank strings
 
-        return True
+        # Revert fields based on backup data. Fields missing from the page are skipped.
+        write_values(self.browser, dict(zip(backup_df["field_name"], backup_df["value"])))
     
     # ==============================
     #   Fill page based on a diff
     # ==============================
 
-    def diff_fill(self, filename: str):
-        from .diff import display_differences
-        # Fetching the mismatches using display_differences
-        mismatches = display_differences(filename)
-        
-        # Loop through the mismatches
-        for field_name, values in mismatches.items():
-            excel_value = values["excel_value"]
-            
-            try:
-                # Find the input element
-                input_element = self.browser.find_element(By.XPATH, f"//*[@name='{field_name}']")
-                
-                # Clear the current value and populate with the excel_value
-                input_element.send_keys(Keys.COMMAND, 'a')
-                input_element.send_keys(excel_value)
-                
-            except NoSuchElementException:
-                # Handle the situation when the field is not found.
-                pass
+    def diff_fill(self, filename: str, granularity: str = "char", sheet: str = None):
+        from .diff import display_plan_differences
+
+        dataFrame = load_or_report(filename, sheet, self.console)
+        if dataFrame is None:
+            return
+
+        # Show the diff for every mismatch in the plan, then apply them all
+        plan = ChangePlan.build(dataFrame, snapshot_values(self.browser))
+        display_plan_differences(plan, granularity)
+
+        # Replace every mismatched field with its spreadsheet value in one bulk write
+        mismatches = plan.mismatches()
+        write_values(self.browser, dict(zip(mismatches["field_name"], mismatches["sheet_value"])))
+
+
+    # ==================================
+    #   Plan now, apply later
+    # ==================================
+
+    def plan_fill(self, filename: str, plan_path: str, cmd: str = None, sheet: str = None, granularity: str = "char"):
+        """Computes the writes a fill would make and saves them, with each field's current value, to `plan_path`.
+
+        The default fill settles conflicts by rule and on the review screen now,
+        so the plan needs no answers later. 'diff' (which shows the differences
+        first) and 'overwrite' plan to overwrite every mismatch. Nothing is written.
+        """
+        from .modules.objects import file_digest
+        from .modules.planfile import write_plan
+
+        dataFrame = load_or_report(filename, sheet, self.console)
+        if dataFrame is None:
+            return
+        try:
+            policy = ConflictPolicy.from_config() if cmd not in ("diff", "overwrite") else None
+        except ConflictRuleError as e:
+            self.console.print(f"[red]{e}[/red]")
+            return
+
+        plan = ChangePlan.build(dataFrame, snapshot_values(self.browser))
+        mismatches = plan.mismatches()
+        actions = mismatches["status"].map({FILL: "fill", CONFLICT: "overwrite"})
+
+        if cmd == "diff":
+            from .diff import display_plan_differences
+            display_plan_differences(plan, granularity)
+
+        elif cmd != "overwrite":
+            conflicts = mismatches["status"] == CONFLICT
+            if conflicts.any():
+                choices = self.choose_conflicts(mismatches[conflicts], policy)
+                actions[conflicts] = choices.map({"o": "overwrite", "a": "append", "s": None})
+
+        planned = actions.notna()
+        mismatches, actions = mismatches[planned], actions[planned]
+        new_values = mismatches["sheet_value"].where(actions != "append", mismatches["page_value"] + mismatches["sheet_value"])
+        writes = pd.DataFrame({
+            "field_name": mismatches["field_name"],
+            "action": actions,
+            "old_value": mismatches["page_value"],
+            "new_value": new_values,
+        })
+
+        counts = plan.counts()
+        write_plan(plan_path, writes,
+                   source=os.path.abspath(filename), digest=file_digest(filename), sheet=sheet, form=self.get_modal_title(),
+                   counts={"unchanged": counts[UNCHANGED], "skipped": int((~planned).sum()), "missing": counts[MISSING]})
+
+        by_action = writes["action"].value_counts()
+        self.console.print(f"[green]Plan saved to {plan_path}: {int(by_action.get('fill', 0))} to fill, "
+                           f"{int(by_action.get('overwrite', 0))} to overwrite, {int(by_action.get('append', 0))} to append "
+                           f"({counts[UNCHANGED]} unchanged, {int((~planned).sum())} skipped, {counts[MISSING]} missing).[/green]")
+
+    def apply_plan(self, plan_path: str, force: bool = False) -> bool:
+        """Writes a saved plan in bulk. A field is only written if it still holds the value it had when
+        the plan was made; the rest are reported as stale. Returns False if the plan was not applied."""
+        from .modules.planfile import read_plan, PlanFileError
+        from .modules.writer import write_values_checked
+
+        try:
+            data = read_plan(plan_path)
+        except PlanFileError as e:
+            self.console.print(f"[red]{e}[/red]")
+            return False
+
+        form = self.get_modal_title()
+        if data.get("form") and form != data["form"] and not force:
+            self.console.print(f"[red]This plan was made for '{data['form']}', but the open form is '{form or 'unknown'}'. Use --force to apply it anyway.[/red]")
+            return False
+
+        writes = data["writes"]
+        with self._recording():
+            with Progress(console=self.console, auto_refresh=False) as progress:
+                task = progress.add_task(f"[cyan]Applying {len(writes)} planned writes...", total=len(writes))
+
+                def advance(count):
+                    progress.update(task, advance=count)
+                    progress.refresh()
+
+                entries = zip(writes["field_name"], writes["old_value"], writes["new_value"])
+                missing, stale = write_values_checked(self.browser, entries, on_chunk=advance)
+
+            missing = set(missing)
+            applied = 0
+            for field_name, action, old_value, new_value in writes.itertuples(index=False):
+                if field_name in missing:
+                    self.logger.log("Field Not Found", field_name, old_value, new_value)
+                elif field_name in stale:
+                    self.logger.log("Stale", field_name, stale[field_name], new_value)
+                else:
+                    applied += 1
+                    self.logger.log({"fill": "Filled", "overwrite": "Overwrote", "append": "Appended"}[action], field_name, old_value, new_value)
+                    if action != "fill":
+                        self.change_logger.add(field_name, action, old_value, new_value)
+
+        if stale:
+            table = Table(show_header=True, box=SIMPLE_HEAD)
+            table.add_column("Field")
+            table.add_column("Planned Against")
+            table.add_column("Now")
+            planned_against = dict(zip(writes["field_name"], writes["old_value"]))
+            for field_name, current_value in stale.items():
+                table.add_row(field_name, f"[yellow]{planned_against[field_name]}[/yellow]", f"[red]{current_value}[/red]")
+            self.console.print(Panel(f"[reverse red] {len(stale)} fields changed since the plan was made and were left alone [/reverse red]", expand=True))
+            self.console.print(table)
+
+        for field_name in missing:
+            self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]not found on the page![/red]")
+
+        self.console.print(f"[green]Applied {applied} of {len(writes)} planned writes ({len(stale)} stale, {len(missing)} missing).[/green]")
+        self.console.print(f"Log saved to {self.logger.log_path}")
+        return True
 
 
     # =======================================
     # Logic for cosmo fill 'overwrite' option
     # =======================================
 
-    def overwrite_fill(self, filename: str):
-        file_ext = filename.split('.')[-1]
-        if file_ext == 'xlsx':
-            dataFrame = pd.read_excel(filename)
-        elif file_ext == 'csv':
-            dataFrame = pd.read_csv(filename)
-        else:
-            self.console.print("[red]Unsupported file format. Please provide an Excel or CSV file.[/red]")
+    def overwrite_fill(self, filename: str, stream: bool = False, sheet: str = None):
+        opened = self._open_rows(filename, sheet, stream)
+        if opened is None:
             return
+        total_rows, chunks = opened
+
+        rows_seen = 0
 
         with Progress(console=self.console, auto_refresh=False) as progress:
-            task = progress.add_task("[cyan]Overwriting form...", total=dataFrame.shape[0])
+            task = progress.add_task("[cyan]Overwriting form...", total=total_rows)
 
-            for index, row in dataFrame.iterrows():
-                field_name = row.iloc[0]
-                value = row.iloc[1]
-                timestamp = datetime.datetime.now().isoformat()
+            def advance(count):
+                progress.update(task, advance=count)
+                progress.refresh()
 
-                try:
-                    input_element = self.browser.find_element(By.XPATH, f"//*[@name='{field_name}']")
-                    input_element.send_keys(Keys.COMMAND, 'a')  # Clear the current value
-                    input_element.send_keys(value)  # Populate with the value from the file
+            for chunk in chunks:
+                values = dict(zip(chunk.iloc[:, 0], chunk.iloc[:, 1]))
+                rows_seen += len(values)
+                missing = set(write_values(self.browser, values, on_chunk=advance))
 
-                    self.console.print(f"[green]Overwrote the [yellow]'{field_name}'[/yellow] field with value [cyan]{value}[/cyan].[/green]")
-                except NoSuchElementException:
-                    self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]not found on the page![/red]")
+                for field_name, value in values.items():
+                    if str(field_name) in missing:
+                        self.console.print(f"[red]Field with name [/red][yellow]{field_name}[/yellow] [red]not found on the page![/red]")
+                    else:
+                        self.console.print(f"[green]Overwrote the [yellow]'{field_name}'[/yellow] field with value [cyan]{value}[/cyan].[/green]")
 
-                # Update the progress bar at the end of each iteration
-                progress.update(task, advance=1)
-                progress.refresh()
+            self._settle_progress(progress, task, rows_seen)
 
         self.console.print("Form overwriting completed!")
     
@@ -1,8 +1,9 @@
 import datetime
 import sqlite3
+import atexit
+import uuid
 import os
-from rich.console import Console
-from rich.table import Table
+from .modules import profiler
 
 # Find the user's home directory
 HOME_DIR = os.path.expanduser("~")
@@ -10,21 +11,60 @@ HOME_DIR = os.path.expanduser("~")
 # Construct the path for the database directory
 DB_DIR = os.path.join(HOME_DIR, '.config', 'cosmo', 'database')
 
-# Check if the directory exists, if not, create it
-if not os.path.exists(DB_DIR):
-    os.makedirs(DB_DIR)
-
 # Now, set the DATABASE variable to point to the correct path
 DATABASE = os.path.join(DB_DIR, 'history.db')
 
+# Field names per "IN (...)" lookup; stays under SQLite's bound-parameter limit
+LOOKUP_BATCH = 500
+
+# Bump this and add a step to MIGRATIONS whenever the schema changes.
+# Each step upgrades the database from version (index) to (index + 1).
+MIGRATIONS = [
+    # 0 -> 1: group entries by fill run
+    ['ALTER TABLE history_entries ADD COLUMN run_id TEXT'],
+    # 1 -> 2: indexes for filtered/paginated history queries
+    ['CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history_entries (timestamp)',
+     'CREATE INDEX IF NOT EXISTS idx_history_field_name ON history_entries (field_name, timestamp)',
+     'CREATE INDEX IF NOT EXISTS idx_history_run_id ON history_entries (run_id)'],
+    # 2 -> 3: what each (sheet, form) pair last had applied, for incremental fills
+    ['''CREATE TABLE IF NOT EXISTS applied_rows (
+            sheet_key TEXT,
+            form_key TEXT,
+            field_name TEXT,
+            fingerprint TEXT,
+            PRIMARY KEY (sheet_key, form_key, field_name)
+        )'''],
+]
+
+HISTORY_COLUMNS = ('timestamp', 'field_name', 'action', 'old_value', 'new_value', 'run_id')
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
 class History:
 
-    def __init__(self):
+    # Buffered entries are written in a single transaction once this many pile up
+    FLUSH_EVERY = 500
+
+    def __init__(self, run_id: str = None, flush_every: int = FLUSH_EVERY):
+        # Check if the directory exists, if not, create it
+        if not os.path.exists(DB_DIR):
+            os.makedirs(DB_DIR)
+
         self.entries = []
+        self.pending = []
+        self.flush_every = flush_every
+        self.run_id = run_id or new_run_id()
         self.conn = sqlite3.connect(DATABASE)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
         self.cursor = self.conn.cursor()
         self.initialize_database()
 
+        # Make sure buffered entries still reach the database if the run dies early
+        atexit.register(self.flush)
+
     def initialize_database(self):
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS history_entries (
@@ -35,29 +75,168 @@ class History:
                 new_value TEXT
             )
         ''')
+        self.migrate()
         self.conn.commit()
 
+    def migrate(self):
+        """Brings an existing history_entries table up to SCHEMA_VERSION."""
+        version = self.cursor.execute('PRAGMA user_version').fetchone()[0]
+        columns = {row[1] for row in self.cursor.execute('PRAGMA table_info(history_entries)')}
+
+        # Databases from before versioning report 0 even if a column was added by hand
+        if version == 0 and 'run_id' in columns:
+            version = 1
+
+        for step in MIGRATIONS[version:]:
+            for statement in step:
+                self.cursor.execute(statement)
+        if version != SCHEMA_VERSION:
+            self.cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def start_run(self) -> str:
+        """Flushes the current run and starts grouping new entries under a fresh run id."""
+        self.flush()
+        self.run_id = new_run_id()
+        return self.run_id
+
     def add(self, field_name, action, old_value, new_value):
         timestamp = datetime.datetime.now().isoformat()
         entry = (timestamp, field_name, action, old_value, new_value)
         self.entries.append(entry)
-        self.cursor.execute('''
-            INSERT INTO history_entries (timestamp, field_name, action, old_value, new_value)
-            VALUES (?, ?, ?, ?, ?)
-        ''', entry)
-        self.conn.commit()
+        self.pending.append(entry + (self.run_id,))
+        profiler.count("history.add")
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Writes every buffered entry in one transaction."""
+        if not self.pending:
+            return
+        with profiler.span("history.flush", rows=len(self.pending)), self.conn:
+            self.conn.executemany('''
+                INSERT INTO history_entries (timestamp, field_name, action, old_value, new_value, run_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        atexit.unregister(self.flush)
+        self.conn.close()
+
+    # ==================================
+    #   Incremental fill bookkeeping
+    # ==================================
+
+    def has_applied(self, sheet_key: str, form_key: str) -> bool:
+        """True once any row of this sheet has been applied to this form."""
+        return self.conn.execute(
+            'SELECT 1 FROM applied_rows WHERE sheet_key = ? AND form_key = ? LIMIT 1', (sheet_key, form_key)).fetchone() is not None
+
+    def applied_fingerprints(self, sheet_key: str, form_key: str, field_names=None) -> dict:
+        """Returns {field_name: fingerprint} for the rows last applied from this sheet to this form.
+
+        Pass `field_names` to fetch just those rows (a streamed chunk) instead of the whole sheet.
+        """
+        query = 'SELECT field_name, fingerprint FROM applied_rows WHERE sheet_key = ? AND form_key = ?'
+        if field_names is None:
+            return dict(self.conn.execute(query, (sheet_key, form_key)))
+
+        field_names = list(field_names)
+        fingerprints = {}
+        for start in range(0, len(field_names), LOOKUP_BATCH):
+            batch = field_names[start:start + LOOKUP_BATCH]
+            fingerprints.update(self.conn.execute(
+                f'{query} AND field_name IN ({",".join("?" * len(batch))})', (sheet_key, form_key, *batch)))
+        return fingerprints
+
+    def record_applied(self, sheet_key: str, form_key: str, fingerprints: dict):
+        """Upserts the fingerprints of rows the page now matches, in one transaction."""
+        with profiler.span("history.record_applied", rows=len(fingerprints)), self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO applied_rows (sheet_key, form_key, field_name, fingerprint) VALUES (?, ?, ?, ?)',
+                [(sheet_key, form_key, field_name, fingerprint) for field_name, fingerprint in fingerprints.items()])
 
     def get_all(self):
-        self.cursor.execute('SELECT * FROM history_entries')
+        self.flush()
+        self.cursor.execute('SELECT timestamp, field_name, action, old_value, new_value FROM history_entries')
         return self.cursor.fetchall()
 
+    def query(self, field=None, action=None, since=None, until=None, run=None, limit=None, offset=0):
+        """Yields matching entries (newest first) straight from the cursor.
+
+        `field` may be a glob pattern (e.g. 'title_*'); `since`/`until` are ISO
+        timestamps or dates and are compared against the stored ISO strings.
+        """
+        self.flush()
+        clauses, params = [], []
+        if field:
+            clauses.append('field_name GLOB ?' if any(c in field for c in '*?[') else 'field_name = ?')
+            params.append(field)
+        if action:
+            clauses.append('action = ?')
+            params.append(action)
+        if since:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if run:
+            clauses.append('run_id = ?')
+            params.append(run)
+
+        sql = f'SELECT {", ".join(HISTORY_COLUMNS)} FROM history_entries'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY timestamp DESC'
+        if limit:
+            sql += ' LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+
+        # A separate cursor so callers can stream while other queries run
+        yield from self.conn.execute(sql, params)
+
 
 #def display_history():
 #    for entry in history.get_all():
 #        content = f"{entry[2]} '{entry[1]}' from '{entry[3]}' to '{entry[4]}' at {entry[0]}"
 #        print(content)
 
-def display_history():
+def _text(value) -> str:
+    return "" if value is None else str(value)
+
+def export_history(entries, fmt: str, stream=None):
+    """Writes entries as JSON or CSV without building a Rich table."""
+    import sys
+    import csv
+    import json
+
+    stream = stream or sys.stdout
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(HISTORY_COLUMNS)
+        writer.writerows(entries)
+    elif fmt == "json":
+        # Streamed one object at a time so large histories never sit in memory
+        stream.write("[")
+        for index, entry in enumerate(entries):
+            stream.write(("," if index else "") + "\n  " + json.dumps(dict(zip(HISTORY_COLUMNS, entry))))
+        stream.write("\n]\n")
+    else:
+        raise ValueError(f"Unknown history format: {fmt}")
+
+def display_history(field=None, action=None, since=None, until=None, run=None, limit=50, page=1, fmt="table"):
+    offset = (max(page, 1) - 1) * limit if limit else 0
+    entries = get_history().query(field=field, action=action, since=since, until=until, run=run, limit=limit, offset=offset)
+
+    if fmt != "table":
+        export_history(entries, fmt)
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
     # Create a rich Console object
     console = Console()
     
@@ -70,10 +249,11 @@ def display_history():
     table.add_column("Action", style="bold", width=10)
     table.add_column("Old Value", width=30)
     table.add_column("New Value", width=30)
+    table.add_column("Run", style="dim", width=12)
     
     # Populate the table with history data
-    for entry in history.get_all():
-        timestamp, field_name, action, old_value, new_value = entry
+    for entry in entries:
+        timestamp, field_name, action, old_value, new_value, run_id = entry
         if action == "append":
             action_style = "yellow"
         elif action == "overwrite":
@@ -83,15 +263,24 @@ def display_history():
         else:
             action_style = "white"
         
-        table.add_row(timestamp, field_name, f"[{action_style}]{action}", old_value, new_value)
+        table.add_row(timestamp, _text(field_name), f"[{action_style}]{action}", _text(old_value), _text(new_value), _text(run_id))
     
     # Display the table on the console
     console.print(table)
+    if limit and table.row_count == limit:
+        console.print(f"[dim]Showing page {page}. Use --page {page + 1} for older entries.[/dim]")
+
+# The shared History is opened on first use rather than at import time
+_history = None
 
-history = History()
+def get_history() -> History:
+    global _history
+    if _history is None:
+        _history = History()
+    return _history
 
 def add_to_history(field_name, action, old_value, new_value):
-    history.add(field_name, action, old_value, new_value)
+    get_history().add(field_name, action, old_value, new_value)
 
 if __name__ == '__main__':
     display_history()
\ No newline at end of file
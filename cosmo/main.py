@@ -1,26 +1,103 @@
 import typer
 from typing import Optional
-from .fill import CosmoFiller
-from .verify import verify as run_verify
-from .diff import display_differences as run_diff
 from .version_control import VersionControl
-from .backup import BackupControl
-from .modules.aliases import AliasConfigParser
-from rich import print
 import os
 
+# Heavier modules (selenium, pandas, rich, sqlite) are imported inside the
+# commands that need them, so '--help' and 'stage' stay fast. For the same
+# reason help and tracebacks use click's plain formatting: typer's rich help
+# and pretty exceptions import most of rich on every run.
+LIGHT_TYPER = dict(rich_markup_mode=None, pretty_exceptions_enable=False)
+
 app = typer.Typer(
     name="cosmo",
     help="Cosmo: Auto-filler for web forms using Excel or CSV data 🪄",
     add_completion=False,
-    add_help_option=True
+    add_help_option=True,
+    **LIGHT_TYPER
 )
 
+# ===================
+#   Global options
+# ===================
+
+@app.callback()
+def cosmo_options(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Time each phase of the command, print a breakdown and save a Chrome trace."),
+    profile_out: Optional[str] = typer.Option(None, "--profile-out", help="Where to save the --profile trace (default: ~/.config/cosmo/profiles/)."),
+    backend: str = typer.Option("selenium", "--backend", help="How to talk to Chrome: 'selenium' (via chromedriver) or 'cdp' (DevTools websocket directly; needs 'pip install cosmo[cdp]').")
+    ):
+    """Cosmo: Auto-filler for web forms using Excel or CSV data 🪄"""
+    if backend != "selenium":
+        from .modules import session
+        try:
+            session.set_backend(backend)
+        except ValueError as e:
+            typer.echo(f"Error: {e}")
+            raise typer.Exit(code=1)
+
+    if not (profile or profile_out):
+        return
+
+    from .modules import profiler
+    profiler.enable()
+    command_span = profiler.span(f"cosmo {ctx.invoked_subcommand}")
+    command_span.__enter__()
+
+    def report():
+        command_span.__exit__(None, None, None)
+        profiler.print_summary()
+        typer.echo(f"Profile trace saved to {profiler.write_trace(profile_out)}", err=True)
+
+    ctx.call_on_close(report)
+
 stage_app = typer.Typer(
      help="Stages an excel file for editing",
-     invoke_without_command=True
+     invoke_without_command=True,
+     **LIGHT_TYPER
      )
 
+# ===================
+#   Sheet selection
+# ===================
+
+SHEET_HELP = "Sheet of a workbook to use, or 'all' for every sheet (defaults to the first, or the one chosen when staging)."
+
+def _select_sheets(filename: str, sheet: Optional[str]) -> list:
+    """Turns --sheet into the sheets to process. [None] means the first sheet, untargeted."""
+    if not sheet:
+        return [None]
+
+    from .modules.sheets import sheet_names, UnsupportedFileError
+    try:
+        names = sheet_names(filename)  # Parses every sheet once; each run below reads from the cache
+    except UnsupportedFileError:
+        return [None]  # The command reports the unsupported format itself
+
+    if sheet == "all":
+        return names
+    if sheet not in names:
+        typer.echo(f"Error: Sheet '{sheet}' not found in {filename}. Sheets: {', '.join(names)}")
+        raise typer.Exit(code=1)
+    return [sheet]
+
+def _for_each_sheet(browser, sheets: list, run):
+    """Calls run(sheet) per sheet. With several sheets, or a [Sheets] entry for the one chosen,
+    the sheet's modal or tab is brought forward first; sheets whose target is not open are skipped."""
+    from rich import print
+    from .modules.targets import sheet_targets, target_for, switch_to_target
+
+    targets = sheet_targets()
+    for sheet in sheets:
+        if sheet is not None and (len(sheets) > 1 or sheet in targets):
+            target = target_for(sheet, targets)
+            if not switch_to_target(browser, target):
+                print(f"[red]No open modal or tab matches '{target}'; skipping sheet '{sheet}'.[/red]")
+                continue
+            print(f"[cyan]Sheet '{sheet}' → {target}[/cyan]")
+        run(sheet)
+
 # ===================
 #   Cosmo 'Fill'
 # ===================
@@ -28,33 +105,111 @@ stage_app = typer.Typer(
 @app.command()
 def fill(
     filename: str = typer.Option(None, "--file", "-f", help="Path to a Excel or CSV file with data."),
-    cmd: Optional[str] = typer.Option(None, "--cmd", help="Command to run ('diff', 'overwrite', or default autofill)")
+    cmd: Optional[str] = typer.Option(None, "--cmd", help="Command to run ('diff', 'overwrite', or default autofill)"),
+    verify_after: bool = typer.Option(False, "--verify", help="Verify the page against the file after filling, in the same browser session."),
+    incremental: bool = typer.Option(False, "--incremental", help="Only consider rows that changed since the last fill of this sheet into this form."),
+    backup: bool = typer.Option(False, "--backup", help="Back up the form's current values before filling."),
+    stream: bool = typer.Option(False, "--stream", help="Read the sheet in chunks and start writing before it is fully parsed (for very large files)."),
+    sheet: Optional[str] = typer.Option(None, "--sheet", help=SHEET_HELP),
+    defer: bool = typer.Option(False, "--defer", help="Don't stop at each conflict: settle them all at the end by the [ConflictRules] in config.toml, then on one review screen."),
+    plan: Optional[str] = typer.Option(None, "--plan", help="Write nothing; save the planned changes to this file for 'cosmo apply'.")
     ):
         """Fills the page using data from an .xlsx or .csv file"""
+        from rich import print
+        from .fill import CosmoFiller
+
         if not filename:
             vc = VersionControl()
             filename = vc.filename
             if not filename:
                 print("[red]No staged file found. Please stage a file using '[green]cosmo[/green] [blue]stage[/blue] [orange]-f[/orange] [yellow]<excel file>[/yellow]' or provide a file directly.[/red]")
                 return
+            sheet = sheet or vc.staged_sheet()
+
+        sheets = _select_sheets(filename, sheet)
+        if plan and len(sheets) > 1:
+            typer.echo("Error: --plan saves one sheet at a time; pick one with --sheet.")
+            raise typer.Exit(code=1)
 
         cosmo = CosmoFiller()
 
-        if cmd == "diff":
-            cosmo.diff_fill(filename)
+        def fill_sheet(sheet):
+            if plan:
+                cosmo.plan_fill(filename, plan, cmd=cmd, sheet=sheet)
+                return
 
-        elif cmd == "overwrite":
-            cosmo.overwrite_fill(filename)
+            if cmd == "diff":
+                cosmo.diff_fill(filename, sheet=sheet)
 
-        else:
-            cosmo.autofill(filename)
+            elif cmd == "overwrite":
+                cosmo.overwrite_fill(filename, stream=stream, sheet=sheet)
+
+            else:
+                cosmo.autofill(filename, backup=backup, incremental=incremental, stream=stream, sheet=sheet, defer=defer)
+
+            if verify_after:
+                from .verify import verify as run_verify
+                run_verify(filename, browser=cosmo.browser, sheet=sheet)
+
+        _for_each_sheet(cosmo.browser, sheets, fill_sheet)
+
+# ===================
+#   Cosmo 'apply'
+# ===================
+
+@app.command()
+def apply(
+    plan_file: str = typer.Argument(..., help="Plan saved by 'cosmo fill --plan'"),
+    force: bool = typer.Option(False, "--force", help="Apply even if the open form's title differs from the one the plan was made on.")
+    ):
+        """Applies a saved plan, skipping fields that changed since it was made"""
+        from .fill import CosmoFiller
+
+        if not os.path.exists(plan_file):
+            typer.echo(f"Error: Plan not found at {plan_file}.")
+            raise typer.Exit(code=1)
+
+        if not CosmoFiller().apply_plan(plan_file, force=force):
+            raise typer.Exit(code=1)
+
+# ===================
+#   Cosmo 'fill-batch'
+# ===================
+
+@app.command(name="fill-batch")
+def fill_batch(
+    manifest: str = typer.Argument(..., help="TOML manifest listing [[jobs]] with a debugger address/port, optional tab and sheet"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Number of forms to fill at once (defaults to one per job)."),
+    on_conflict: str = typer.Option("skip", "--on-conflict", help="What to do with fields that already hold a different value: 'skip', 'append' or 'overwrite'.")
+    ):
+        """Fills several forms in parallel, one Chrome debugging session per job"""
+        from .batch import load_manifest, run_batch, display_batch_summary
+
+        if on_conflict not in ("skip", "append", "overwrite"):
+            typer.echo("Error: --on-conflict must be one of 'skip', 'append' or 'overwrite'.")
+            raise typer.Exit(code=1)
+
+        try:
+            jobs = load_manifest(manifest)
+        except (OSError, ValueError) as error:  # Missing file, bad TOML (TomlDecodeError is a ValueError) or a bad job
+            typer.echo(f"Error: Could not read manifest {manifest}: {error}")
+            raise typer.Exit(code=1)
+        if not jobs:
+            typer.echo(f"Error: No [[jobs]] found in {manifest}.")
+            raise typer.Exit(code=1)
+
+        results = run_batch(jobs, workers=workers, on_conflict=on_conflict[0])
+        display_batch_summary(results)
+        if any(result["error"] for result in results):
+            raise typer.Exit(code=1)
 
 # ===================
 #   Cosmo 'verify'
 # ===================
 
 @app.command()
-def verify(filename: str = typer.Option(None, "--file", "-f", help="Path to the Excel file to Verify")):
+def verify(filename: str = typer.Option(None, "--file", "-f", help="Path to the Excel file to Verify"),
+           sheet: Optional[str] = typer.Option(None, "--sheet", help=SHEET_HELP)):
     """Verify data on the webpage against the Excel or CSV file."""
     if filename is None:
         vc = VersionControl()
@@ -62,17 +217,37 @@ def verify(filename: str = typer.Option(None, "--file", "-f", help="Path to the
         if filename == "No file currently staged.":
             typer.echo("[red]No staged file found. Please stage a file using 'cosmo stage -f <excel file>' or provide a file directly.[/red]")
             raise typer.Exit(code=1)
-    run_verify(filename)
+        sheet = sheet or vc.staged_sheet()
+
+    from .verify import verify as run_verify
+    from .modules.session import get_browser
+
+    sheets = _select_sheets(filename, sheet)
+    browser = get_browser()
+    _for_each_sheet(browser, sheets, lambda sheet: run_verify(filename, browser=browser, sheet=sheet))
 
 # ===================
 #   Cosmo 'history'
 # ===================
 
 @app.command()
-def history():
+def history(
+    field: Optional[str] = typer.Option(None, "--field", help="Only show this field (glob patterns like 'title_*' work)."),
+    action: Optional[str] = typer.Option(None, "--action", help="Only show this action ('skip', 'append' or 'overwrite')."),
+    since: Optional[str] = typer.Option(None, "--since", help="Only show entries at or after this ISO date/time."),
+    until: Optional[str] = typer.Option(None, "--until", help="Only show entries before this ISO date/time."),
+    run: Optional[str] = typer.Option(None, "--run", help="Only show entries from this fill run id."),
+    limit: int = typer.Option(50, "--limit", help="Entries per page (0 for no limit)."),
+    page: int = typer.Option(1, "--page", help="Page number, newest entries first."),
+    fmt: str = typer.Option("table", "--format", help="Output format: 'table', 'json' or 'csv'.")
+    ):
     """Shows a history of recent changes"""
     from .history import display_history
-    display_history()
+
+    if fmt not in ("table", "json", "csv"):
+        typer.echo("Error: --format must be one of 'table', 'json' or 'csv'.")
+        raise typer.Exit(code=1)
+    display_history(field=field, action=action, since=since, until=until, run=run, limit=limit, page=page, fmt=fmt)
 
 
 # ===================
@@ -81,9 +256,40 @@ def history():
 
 
 @app.command()
-def revert(filename: str = typer.Option(..., "--file", "-f", help="Path to the file to revert to")
+def revert(filename: str = typer.Option(None, "--file", "-f", help="Path to the backup file to revert to"),
+           uuid: Optional[str] = typer.Option(None, "--uuid", help="UUID whose backups to revert from"),
+           latest: bool = typer.Option(False, "--latest", help="With --uuid: revert to that UUID's most recent backup"),
+           at: Optional[str] = typer.Option(None, "--at", help="With --uuid: revert to the state as of this ISO date/time")
            ):
         """Reverts to a previous state"""
+        from rich import print
+        from .fill import CosmoFiller
+
+        if filename is None:
+            if not (uuid and (latest or at)):
+                typer.echo("Error: Provide --file, or --uuid with --latest or --at.")
+                raise typer.Exit(code=1)
+
+            import datetime
+            from .backup import BackupControl
+
+            try:
+                point_in_time = datetime.datetime.fromisoformat(at) if at else None
+            except ValueError:
+                typer.echo(f"Error: Could not parse --at '{at}'. Use an ISO date/time like 2024-05-01T14:30.")
+                raise typer.Exit(code=1)
+
+            # Rebuilt from the UUID's base snapshot and the deltas after it
+            backup_df = BackupControl().state_at(uuid, point_in_time)
+            if backup_df is None:
+                print(f"No backups found for {uuid}" + (f" at or before {at}." if at else "."))
+                raise typer.Exit(code=1)
+
+            cosmo = CosmoFiller()
+            cosmo.revert_data(backup_df)
+            print("Reverted to the previous state.")
+            return
+
         cosmo = CosmoFiller()
         if cosmo.revert_file(filename):  # Assuming you have the revert function in fill.py
             print("Reverted to the previous state.")
@@ -95,7 +301,9 @@ def revert(filename: str = typer.Option(..., "--file", "-f", help="Path to the f
 # ===================
 
 @app.command()
-def diff(filename: str = typer.Option(None, "--file", "-f", help="Path to an Excel or CSV to diff vs. the webpage")):
+def diff(filename: str = typer.Option(None, "--file", "-f", help="Path to an Excel or CSV to diff vs. the webpage"),
+         granularity: str = typer.Option("char", "--granularity", "-g", help="Compare values by 'char', 'word' or 'line'"),
+         sheet: Optional[str] = typer.Option(None, "--sheet", help=SHEET_HELP)):
         """Shows a diff of the page vs. the Spreadsheet"""
         if filename is None:
             vc = VersionControl()
@@ -103,25 +311,43 @@ def diff(filename: str = typer.Option(None, "--file", "-f", help="Path to an Exc
             if filename == "No file currently staged.":
                 typer.echo("[red]No staged file found. Please stage a file using 'cosmo stage -f <excel file>' or provide a file directly.[/red]")
                 raise typer.Exit(code=1)
-        run_diff(filename)
+            sheet = sheet or vc.staged_sheet()
+
+        from .diff import display_differences as run_diff, GRANULARITIES
+        from .modules.session import get_browser
+        if granularity not in GRANULARITIES:
+            typer.echo(f"Error: --granularity must be one of {', '.join(GRANULARITIES)}.")
+            raise typer.Exit(code=1)
+
+        sheets = _select_sheets(filename, sheet)
+        browser = get_browser()
+        _for_each_sheet(browser, sheets, lambda sheet: run_diff(filename, browser=browser, granularity=granularity, sheet=sheet))
 
 # ===================
 #   Cosmo stage 'set'
 # ===================
 
+def _report_stage(result: dict, label: str):
+    typer.echo(f"{label} has been staged.")
+    if result["same_as"]:
+        typer.echo(f"Identical to committed version {result['same_as']}.")
+    elif not result["copied"]:
+        typer.echo("Content unchanged since it was last staged; nothing was copied.")
+
 @stage_app.command(name="set")
 def set_stage(
     folder_alias: str = typer.Argument(None, help="Folder alias (set in aliases.config) for staging"),
     file_alias: str = typer.Argument(None, help="File alias (set in aliases.config) for staging"),
-    force: Optional[str] = typer.Option(None, "--file", "-f", help="Specify a file for staging")
+    force: Optional[str] = typer.Option(None, "--file", "-f", help="Specify a file for staging"),
+    sheet: Optional[str] = typer.Option(None, "--sheet", help="Sheet of the workbook that fill, verify and diff use by default, or 'all'.")
 ):
     """Stages a Spreadsheet to use against the webpage"""
     
     if force:
         if os.path.exists(force):
+            _select_sheets(force, sheet)  # Fails early on a sheet the workbook does not have
             vc = VersionControl(force)
-            vc.stage()
-            typer.echo(f"File {force} has been staged.")
+            _report_stage(vc.stage(sheet), f"File {force}")
             return
         else:
             typer.echo(f"Error: File not found at {force}.")
@@ -131,6 +357,8 @@ def set_stage(
         typer.echo("Error: Please specify either folder_alias or file_alias.")
         raise typer.Exit(code=1)
     
+    from .modules.aliases import AliasConfigParser
+
     # Specify the actual config file path
     config_file_path = os.path.expanduser("~/.config/cosmo/aliases.config")
 
@@ -159,14 +387,13 @@ def set_stage(
                 typer.echo(f"Error: File not found at {absolute_file_path}.")
                 raise typer.Exit(code=1)
 
+            _select_sheets(absolute_file_path, sheet)
             vc = VersionControl(absolute_file_path)
-            vc.stage()
-            typer.echo(f"File {absolute_file_path} has been staged.")
+            _report_stage(vc.stage(sheet), f"File {absolute_file_path}")
         else:
             # If only a folder is specified without a specific file alias
             vc = VersionControl(folder_path)
-            vc.stage()
-            typer.echo(f"Folder {folder_path} has been staged.")
+            _report_stage(vc.stage(), f"Folder {folder_path}")
 
 
 
@@ -181,10 +408,9 @@ def show_stage():
     """Show the currently staged file."""
     vc = VersionControl()
     staged_file = vc.staged_file()
-    if staged_file:
-        typer.echo(f"Staged file: {staged_file}")
-    else:
-        typer.echo("No file currently staged.")
+    typer.echo(f"Staged file: {staged_file}")
+    if vc.staged_sheet():
+        typer.echo(f"Sheet: {vc.staged_sheet()}")
 
 # ===================
 #   Cosmo stage 'unset'
@@ -196,15 +422,93 @@ def unset_stage():
     vc.unstage()
     typer.echo("Staged file has been unstaged.")
 
+# ===================
+#   Cosmo stage 'commit'
+# ===================
+@stage_app.command(name="commit")
+def commit_stage(message: str = typer.Option(..., "--message", "-m", help="Short description of this version")):
+    """Records the staged file as a new version."""
+    vc = VersionControl()
+    try:
+        entry = vc.commit(message)
+    except ValueError as error:
+        typer.echo(f"Error: {error}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Committed version {entry['name']} ({entry['digest'][:12]}).")
+
+# ===================
+#   Cosmo stage 'rollback'
+# ===================
+@stage_app.command(name="rollback")
+def rollback_stage(version: str = typer.Argument(..., help="Version name, commit message or content hash prefix (see 'cosmo stage log')")):
+    """Stages a previously committed version again."""
+    vc = VersionControl()
+    try:
+        entry = vc.rollback(version)
+    except ValueError as error:
+        typer.echo(f"Error: {error}")
+        raise typer.Exit(code=1)
+    typer.echo(f"Rolled back to {entry['name']}; it is now staged.")
+
+# ===================
+#   Cosmo stage 'log'
+# ===================
+@stage_app.command(name="log")
+def log_stage():
+    """Lists committed versions, newest first."""
+    vc = VersionControl()
+    versions = vc.list_versions()
+    if not versions:
+        typer.echo("No versions committed yet.")
+    for entry in reversed(versions):
+        typer.echo(f"{entry['digest'][:12]}  {entry['name']}  ({entry['source']})")
+
 app.add_typer(stage_app, name="stage")
 
+# ==================
+#   Cosmo logs 'render'
+# ==================
+
+logs_app = typer.Typer(help="Works with the logs written during fills", **LIGHT_TYPER)
+
+@logs_app.command(name="render")
+def render_logs(
+    log_file: str = typer.Argument(None, help="Path to a .jsonl log (defaults to the most recent one)"),
+    fmt: str = typer.Option("all", "--format", help="Output format: 'md', 'txt' or 'all'.")
+):
+    """Renders a fill log as Markdown and/or plain text."""
+    from .modules.logger import CosmoLogger
+
+    logger = CosmoLogger()
+    log_file = log_file or logger.latest_log()
+    if not log_file or not os.path.exists(log_file):
+        typer.echo("Error: No log file found.")
+        raise typer.Exit(code=1)
+
+    formats = ["md", "txt"] if fmt == "all" else [fmt]
+    if any(f not in ("md", "txt") for f in formats):
+        typer.echo("Error: --format must be one of 'md', 'txt' or 'all'.")
+        raise typer.Exit(code=1)
+
+    for f in formats:
+        typer.echo(f"Rendered {logger.render(log_file, f)}")
+
+app.add_typer(logs_app, name="logs")
+
 # ==================
 #   Cosmo Backup
 # ==================
 
-@app.command()
-def backup():
-    """Backs up the current state of the webpage to a uniquely named .xlsx file"""
+backup_app = typer.Typer(help="Backs up the current state of the webpage", **LIGHT_TYPER)
+
+@backup_app.callback(invoke_without_command=True)
+def backup(ctx: typer.Context):
+    """Backs up the current state of the webpage to a compressed, uniquely named backup file"""
+    if ctx.invoked_subcommand is not None:
+        return
+
+    from .fill import CosmoFiller
+    from .backup import BackupControl
 
     # Set Variables
     FIELDS_FILE_PATH = os.path.join(os.path.expanduser("~"), ".config", "cosmo", "data", "12m_Fields.xlsx")
@@ -214,9 +518,10 @@ def backup():
 
     # Instantiate CosmoFiller and get modal title
     cosmo = CosmoFiller()
-    title = cosmo.get_modal_title()  # Use the new method here
-
-    uuid = title.split(' ')[2]  # Assuming format "Translations for UUID customerID"
+    uuid = cosmo.get_form_uuid()
+    if uuid is None:
+        typer.echo("Error: Could not read the form's UUID from the modal title.")
+        raise typer.Exit(code=1)
 
     # Extract desired data from the webpage
     backup_df = cosmo.backup_data(field_names)
@@ -226,6 +531,53 @@ def backup():
     backup_filename = backup_controller.save_to_backup(backup_df, uuid)
     cosmo.console.print(f"[yellow]Backup saved to {backup_filename}![/yellow]")
 
+# ==================
+#   Cosmo backup 'export'
+# ==================
+
+@backup_app.command(name="export")
+def export_backup(
+    filename: str = typer.Option(None, "--file", "-f", help="Backup file to export"),
+    uuid: Optional[str] = typer.Option(None, "--uuid", help="Export this UUID's most recent backup"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Where to write the .xlsx (defaults to next to the backup)")
+):
+    """Exports a backup to an .xlsx file"""
+    from .backup import BackupControl
+
+    backup_controller = BackupControl()
+    if filename is None and uuid:
+        filename = backup_controller.latest_backup(uuid)
+    if not filename or not os.path.exists(filename):
+        typer.echo("Error: No backup found. Provide --file or a --uuid that has backups.")
+        raise typer.Exit(code=1)
+
+    typer.echo(f"Exported to {backup_controller.export_xlsx(filename, output)}")
+
+# ==================
+#   Cosmo backup 'compact'
+# ==================
+
+@backup_app.command(name="compact")
+def compact_backups(
+    uuid: str = typer.Option(..., "--uuid", help="UUID whose backups to compact"),
+    keep: int = typer.Option(5, "--keep", help="Number of most recent backups to keep as separate points in time"),
+    before: Optional[str] = typer.Option(None, "--before", help="Instead of --keep, fold every backup at or before this ISO date/time")
+):
+    """Folds old delta backups into a single base snapshot"""
+    import datetime
+    from .backup import BackupControl
+
+    try:
+        cutoff = datetime.datetime.fromisoformat(before) if before else None
+    except ValueError:
+        typer.echo(f"Error: Could not parse --before '{before}'.")
+        raise typer.Exit(code=1)
+
+    removed = BackupControl().compact(uuid, keep=keep, before=cutoff)
+    typer.echo(f"Compacted backups for {uuid}: removed {removed} file(s).")
+
+app.add_typer(backup_app, name="backup")
+
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,159 @@
+# ==========================================
+#   CDP Backend
+#   Talks to Chrome's DevTools websocket
+#   directly instead of going through
+#   chromedriver, many commands in flight.
+# ==========================================
+
+import json
+import asyncio
+import itertools
+import threading
+import urllib.request
+from . import profiler
+
+CONNECT_TIMEOUT = 10
+COMMAND_TIMEOUT = 120
+
+# find_element() stand-in: Cosmo only ever reads an element's text by CSS selector
+ELEMENT_TEXT_SCRIPT = """
+const el = document.querySelector(arguments[0]);
+return el ? el.innerText : null;
+"""
+
+
+class CDPError(RuntimeError):
+    pass
+
+
+class CDPElement:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def page_websocket_url(debugger_address: str) -> str:
+    """Finds the first page's DevTools websocket on a debugging port (a ws:// URL is used as-is)."""
+    if debugger_address.startswith(("ws://", "wss://")):
+        return debugger_address
+    with urllib.request.urlopen(f"http://{debugger_address}/json/list", timeout=CONNECT_TIMEOUT) as response:
+        targets = json.load(response)
+    for target in targets:
+        if target.get("type") == "page" and target.get("webSocketDebuggerUrl"):
+            return target["webSocketDebuggerUrl"]
+    raise CDPError(f"No debuggable page found at {debugger_address}")
+
+
+def script_expression(script: str, args) -> str:
+    # Same contract as WebDriver's execute_script: the script is a function body that sees `arguments`
+    return f"(function() {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+
+
+class CDPBrowser:
+    """Covers the WebDriver surface Cosmo uses (execute_script, find_element, quit) over raw CDP.
+
+    The websocket lives on an asyncio loop in a background thread, so callers
+    stay synchronous. execute_script_many() sends a batch of calls before
+    waiting on any of them.
+    """
+
+    def __init__(self, debugger_address: str):
+        try:
+            import websockets
+        except ImportError:
+            raise CDPError("The CDP backend needs the 'websockets' package: pip install 'cosmo[cdp]'")
+
+        self._websockets = websockets
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._socket = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        try:
+            self._call(self._connect(page_websocket_url(debugger_address)), CONNECT_TIMEOUT)
+        except Exception:
+            self._stop_loop()
+            raise
+
+    # ==================================
+    #   Event loop plumbing
+    # ==================================
+
+    def _call(self, coroutine, timeout: float = COMMAND_TIMEOUT):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    async def _connect(self, url: str):
+        self._socket = await self._websockets.connect(url, max_size=None)
+        self._reader = self._loop.create_task(self._read())
+
+    async def _read(self):
+        error = CDPError("DevTools connection closed")
+        try:
+            async for message in self._socket:
+                reply = json.loads(message)
+                future = self._pending.pop(reply.get("id"), None)  # Events carry no id
+                if future is None or future.done():
+                    continue
+                if "error" in reply:
+                    future.set_exception(CDPError(reply["error"].get("message", "CDP command failed")))
+                else:
+                    future.set_result(reply.get("result", {}))
+        except Exception as e:
+            error = CDPError(f"DevTools connection lost: {e}")
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    async def _send(self, method: str, params: dict = None) -> dict:
+        command_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[command_id] = future
+        await self._socket.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        return await future
+
+    async def _evaluate(self, script: str, args) -> object:
+        result = await self._send("Runtime.evaluate", {
+            "expression": script_expression(script, args),
+            "returnByValue": True,
+            "awaitPromise": True,
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text", "Script failed"))
+        return result.get("result", {}).get("value")
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=CONNECT_TIMEOUT)
+
+    # ==================================
+    #   WebDriver-compatible surface
+    # ==================================
+
+    def execute_script(self, script: str, *args):
+        return self._call(self._evaluate(script, args))
+
+    def execute_script_many(self, script: str, arg_lists):
+        """Runs `script` once per argument tuple with every call in flight at once; yields results in order."""
+        futures = [asyncio.run_coroutine_threadsafe(self._evaluate(script, args), self._loop) for args in arg_lists]
+        profiler.count("cdp.pipelined", len(futures))
+        for future in futures:
+            yield future.result(COMMAND_TIMEOUT)
+
+    def find_element(self, by, selector: str):
+        text = self.execute_script(ELEMENT_TEXT_SCRIPT, selector)
+        if text is None:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"No element matches {selector}")
+        return CDPElement(text)
+
+    def quit(self):
+        if self._socket is not None:
+            try:
+                self._call(self._socket.close(), CONNECT_TIMEOUT)
+            except Exception:
+                pass
+        self._stop_loop()
@@ -0,0 +1,122 @@
+# ==========================================
+#   Config & State
+#   config.toml parsed once per process and
+#   re-read only when it changes; mutable
+#   state kept in a small locked JSON file.
+# ==========================================
+
+import os
+import json
+import threading
+import contextlib
+import toml
+from .objects import write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; writes are still atomic
+    fcntl = None
+
+HOME_DIR = os.path.expanduser("~")
+CONFIG_DIR = os.path.join(HOME_DIR, '.config', 'cosmo')
+CONFIG_PATH = os.path.join(CONFIG_DIR, 'config.toml')
+
+# What Cosmo changes as it runs (staged file, current version) lives apart from
+# the hand-edited config, so config.toml is never rewritten.
+STATE_PATH = os.path.join(CONFIG_DIR, 'state.json')
+STATE_LOCK_PATH = os.path.join(CONFIG_DIR, 'state.lock')
+
+# Keys moved out of config.toml's [VCS] table. Older configs still carry them;
+# they seed the state file the first time it is written.
+STATE_DEFAULTS = {"staged_file": "none", "staged_name": "", "staged_sheet": "", "current_version": "none"}
+
+# Parsed files by path: (mtime_ns, size, data)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# How deep the current thread is inside state_lock()
+_held = threading.local()
+
+
+def _cached(path: str, parse):
+    """Returns parse(path), reusing the last result while the file's mtime and size are unchanged."""
+    stat = os.stat(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+    data = parse(path)
+    with _cache_lock:
+        _cache[path] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """The parsed config.toml, shared by the whole process. Treat it as read-only.
+
+    Raises FileNotFoundError when the file does not exist.
+    """
+    return _cached(os.path.expanduser(path), toml.load)
+
+
+def config_section(name: str, path: str = CONFIG_PATH) -> dict:
+    """One table of config.toml, or {} when the file or the table is missing or unreadable."""
+    try:
+        return load_config(path).get(name, {})
+    except (OSError, toml.TomlDecodeError):
+        return {}
+
+
+# ==================================
+#   State
+# ==================================
+
+def _read_json(path: str) -> dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_state(fresh: bool = False) -> dict:
+    """The mutable state (see STATE_DEFAULTS). Falls back to a legacy [VCS] table before the first write."""
+    try:
+        stored = _read_json(STATE_PATH) if fresh else _cached(STATE_PATH, _read_json)
+    except (OSError, ValueError):
+        legacy = config_section('VCS')
+        stored = {key: legacy[key] for key in STATE_DEFAULTS if key in legacy}
+    return {**STATE_DEFAULTS, **stored}
+
+
+@contextlib.contextmanager
+def state_lock():
+    """Holds an exclusive lock on the state file across processes. Re-entrant within a thread,
+    so a caller can read, decide and update_state() under one lock."""
+    if getattr(_held, 'depth', 0):
+        _held.depth += 1
+        try:
+            yield
+        finally:
+            _held.depth -= 1
+        return
+
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with open(STATE_LOCK_PATH, 'a') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        _held.depth = 1
+        try:
+            yield
+        finally:
+            _held.depth = 0
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def update_state(**values) -> dict:
+    """Merges `values` into the state under the lock, then writes it to a temp file and renames it in place."""
+    with state_lock():
+        state = load_state(fresh=True)  # Another process may have written since we last looked
+        state.update(values)
+        write_json_atomic(STATE_PATH, state)
+        with _cache_lock:
+            _cache.pop(STATE_PATH, None)
+    return state
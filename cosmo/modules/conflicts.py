@@ -0,0 +1,83 @@
+# ==========================================
+#   Conflict Rules
+#   Resolves mismatched fields by name
+#   pattern (from config.toml) instead of
+#   prompting for each one.
+# ==========================================
+
+import re
+import fnmatch
+import pandas as pd
+from .config import config_section, CONFIG_PATH
+
+# Choice letters used at the prompts, keyed by rule action
+ACTIONS = {"skip": "s", "append": "a", "overwrite": "o"}
+
+REGEX_PREFIX = "re:"
+
+
+class ConflictRuleError(ValueError):
+    pass
+
+
+class ConflictPolicy:
+    """Ordered (compiled pattern, choice) rules; the first rule matching a field name wins.
+
+    Patterns are globs over the whole name unless prefixed with "re:", which
+    are searched anywhere in it (anchor with ^/$). Each is compiled once, and
+    resolve() applies them to a whole column of field names at a time.
+    """
+
+    def __init__(self, rules: list = None):
+        self.rules = []
+        for pattern, action in rules or []:
+            if action not in ACTIONS:
+                raise ConflictRuleError(f"Conflict rule '{pattern}': action must be one of {', '.join(ACTIONS)}, not '{action}'.")
+            if pattern.startswith(REGEX_PREFIX):
+                try:
+                    matches = re.compile(pattern[len(REGEX_PREFIX):]).search
+                except re.error as e:
+                    raise ConflictRuleError(f"Conflict rule '{pattern}': {e}")
+            else:
+                matches = re.compile(fnmatch.translate(pattern)).match  # Anchored at the end by translate()
+            self.rules.append((matches, ACTIONS[action]))
+
+    @classmethod
+    def from_config(cls, config_path: str = CONFIG_PATH) -> "ConflictPolicy":
+        """Reads the [ConflictRules] table of config.toml (pattern = "skip" | "append" | "overwrite")."""
+        return cls(list(config_section('ConflictRules', config_path).items()))
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def resolve(self, field_names: pd.Series) -> pd.Series:
+        """Returns each field's choice letter (s/a/o), or None where no rule matches."""
+        field_names = field_names.astype(str)
+        choices = pd.Series(None, index=field_names.index, dtype=object)
+        for matches, choice in self.rules:
+            open_rows = choices.isna()
+            if not open_rows.any():
+                break
+            matched = field_names[open_rows].map(lambda name: matches(name) is not None)
+            choices[matched[matched].index] = choice
+        return choices.where(choices.notna(), None)
+
+
+# ==================================
+#   Batched review
+# ==================================
+
+def parse_selection(selection: str, count: int) -> list:
+    """Turns '1,3-5' (1-based) or 'all' into 0-based positions. Raises ValueError on anything else."""
+    if selection.strip() == "all":
+        return list(range(count))
+    positions = []
+    for part in selection.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        first, last = int(first), int(last or first)
+        if not 1 <= first <= last <= count:
+            raise ValueError(f"{part} is outside 1-{count}")
+        positions.extend(range(first - 1, last))
+    return positions
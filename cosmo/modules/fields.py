@@ -0,0 +1,89 @@
+# ==========================================
+#   Field Index
+#   A name -> element map kept inside the
+#   page, invalidated by a MutationObserver.
+# ==========================================
+
+# Prepended to every script that reads or writes fields. The first run on a
+# page scans the document once; afterwards lookups come from the map, and only
+# names touched by a DOM mutation (MUI re-rendering the modal, rows added or
+# removed, a `name` attribute changing) are looked up again. Navigating to a
+# new page discards `window`, so each page gets a fresh index.
+#
+# Like find_element(By.NAME), the first element in document order wins when
+# several share a name. getElementsByName() takes the raw string, so names
+# containing quotes need no escaping.
+FIELD_INDEX_JS = """
+const fieldIndex = window.__cosmoFieldIndex || (window.__cosmoFieldIndex = (() => {
+    const index = { elements: new Map(), dirty: new Set(), scans: 0, lookups: 0 };
+
+    index.scan = () => {
+        index.elements.clear();
+        index.dirty.clear();
+        for (const el of document.querySelectorAll('[name]')) {
+            const name = el.getAttribute('name');
+            if (!index.elements.has(name)) { index.elements.set(name, el); }
+        }
+        index.scans += 1;
+    };
+
+    const markTree = (node) => {
+        if (node.nodeType !== Node.ELEMENT_NODE) { return; }
+        if (node.hasAttribute('name')) { index.dirty.add(node.getAttribute('name')); }
+        for (const el of node.querySelectorAll('[name]')) { index.dirty.add(el.getAttribute('name')); }
+    };
+
+    new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            if (mutation.type === 'attributes') {
+                if (mutation.oldValue !== null) { index.dirty.add(mutation.oldValue); }
+                if (mutation.target.hasAttribute('name')) { index.dirty.add(mutation.target.getAttribute('name')); }
+            } else {
+                mutation.addedNodes.forEach(markTree);
+                mutation.removedNodes.forEach(markTree);
+            }
+        }
+    }).observe(document, { childList: true, subtree: true, attributes: true,
+                           attributeFilter: ['name'], attributeOldValue: true });
+
+    index.resolve = (name) => {
+        let el = index.elements.get(name);
+        if (index.dirty.has(name) || (el && !el.isConnected)) {
+            index.dirty.delete(name);
+            index.lookups += 1;
+            el = document.getElementsByName(name)[0];
+            if (el) { index.elements.set(name, el); } else { index.elements.delete(name); }
+        }
+        return el || null;
+    };
+
+    index.names = () => {
+        const names = new Set(index.elements.keys());
+        index.dirty.forEach((name) => names.add(name));
+        return names;
+    };
+
+    index.scan();
+    return index;
+})());
+"""
+
+STATS_SCRIPT = FIELD_INDEX_JS + """
+return { fields: fieldIndex.elements.size, dirty: fieldIndex.dirty.size,
+         scans: fieldIndex.scans, lookups: fieldIndex.lookups };
+"""
+
+RESCAN_SCRIPT = FIELD_INDEX_JS + """
+fieldIndex.scan();
+return fieldIndex.elements.size;
+"""
+
+
+def field_index_stats(browser) -> dict:
+    """Returns the page's index size, pending invalidations, full scans and targeted lookups."""
+    return browser.execute_script(STATS_SCRIPT) or {}
+
+
+def rescan_fields(browser) -> int:
+    """Drops the page's index and rebuilds it from a full scan. Returns the number of names."""
+    return browser.execute_script(RESCAN_SCRIPT) or 0
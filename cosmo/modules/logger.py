@@ -1,58 +1,140 @@
 import os
 import json
-import toml
+import glob
+import queue
+import atexit
+import threading
+from collections import namedtuple
 from datetime import datetime
 from rich import print
+from . import profiler
+from .config import load_config, CONFIG_PATH
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) # Gets the directory of the current file.
-CONFIG_PATH = os.path.expanduser("~/.config/cosmo/config.toml")
+
+# One compact record per field touched during a fill
+LogEntry = namedtuple("LogEntry", ["timestamp", "action", "field_name", "prev_value", "new_value"])
+
+_STOP = object() # Tells the writer thread to drain and exit
 
 class CosmoLogger:
 
+    # Entries waiting for the writer thread; log() blocks once this many are queued
+    BUFFER_SIZE = 1000
+
     def __init__(self):
         try:
-            config = toml.load(CONFIG_PATH)
+            config = load_config()
         except FileNotFoundError:
             raise FileNotFoundError(f"Configuration file not found at {CONFIG_PATH}. Please ensure it exists.")
-        
+
         self.timestamp_format = config['Logger']['timestamp_format']
         self.log_directory = os.path.expanduser(config['Logger']['logs_directory'])
 
         if not os.path.exists(self.log_directory):
             os.makedirs(self.log_directory)
-    
+
+        self.log_path = None
+        self._queue = None
+        self._writer = None
+
     def _get_current_timestamp(self):
         return datetime.now().strftime(self.timestamp_format)
 
-    def format_log_entry_md(self, action, field_name, prev_value, new_value):
-        timestamp = self._get_current_timestamp()
+    # ==================================
+    #   Streaming JSONL writer
+    # ==================================
+
+    def _claim_log_path(self, stem: str) -> str:
+        """Creates <stem>.jsonl, or <stem>-2.jsonl, -3, ... when a fill started in the same
+        second (fill --sheet all, fill-batch workers, another process) already took it."""
+        attempt = 1
+        while True:
+            path = os.path.join(self.log_directory, f"{stem}{f'-{attempt}' if attempt > 1 else ''}.jsonl")
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)) # Atomic: only one caller gets each name
+                return path
+            except FileExistsError:
+                attempt += 1
+
+    def start(self, label: str = None) -> str:
+        """Opens a new log_<timestamp>[_<label>].jsonl and starts the background writer."""
+        self.close()
+        suffix = f"_{label}" if label else ""
+        self.log_path = self._claim_log_path(f"log_{self._get_current_timestamp()}{suffix}")
+        self._queue = queue.Queue(maxsize=self.BUFFER_SIZE)
+        self._writer = threading.Thread(target=self._write_loop, args=(self.log_path, self._queue), daemon=True)
+        self._writer.start()
+        atexit.register(self.close) # Whatever was logged still lands on disk if the fill dies
+        return self.log_path
+
+    def log(self, action, field_name, prev_value, new_value):
+        """Queues one entry; it is appended to the current log file in the background."""
+        if self._writer is None:
+            self.start()
+        profiler.count("logger.entries")
+        self._queue.put(LogEntry(self._get_current_timestamp(), action, field_name, prev_value, new_value))
+
+    def close(self):
+        """Flushes every queued entry and stops the writer thread."""
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        with profiler.span("logger.drain"): # Time spent waiting for the writer to catch up
+            self._writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+
+    @staticmethod
+    def _write_loop(log_path, entries):
+        with profiler.span("logger.writer"), open(log_path, 'a') as log_file:
+            while True:
+                entry = entries.get()
+                if entry is _STOP:
+                    break
+                log_file.write(json.dumps(entry._asdict(), default=str) + "\n")
+                if entries.empty():
+                    log_file.flush() # Flush whenever the writer catches up with the fill
+
+    @profiler.profiled("logger.write_log")
+    def write_log(self, log_entries):
+        """Writes a batch of {action, field_name, prev_value, new_value} dicts to a fresh log."""
+        self.start()
+        for entry in log_entries:
+            if isinstance(entry, dict) and all(key in entry for key in ['action', 'field_name', 'prev_value', 'new_value']):
+                self.log(entry['action'], entry['field_name'], entry['prev_value'], entry['new_value'])
+            else:
+                print(f"Skipped invalid log entry: {entry}")
+        self.close()
+        print(f"Log saved to {self.log_path}")
+
+    # ==================================
+    #   On-demand Markdown/TXT rendering
+    # ==================================
+
+    def format_log_entry_md(self, timestamp, action, field_name, prev_value, new_value):
         return f"- **Timestamp**: {timestamp}\n  - **Field Name**: {field_name}\n  - **Action**: {action}\n  - **Previous Value**: {prev_value}\n  - **New Value**: {new_value}\n\n"
 
-    def format_log_entry_txt(self, action, field_name, prev_value, new_value):
-        timestamp = self._get_current_timestamp()
+    def format_log_entry_txt(self, timestamp, action, field_name, prev_value, new_value):
         return f"Timestamp: {timestamp}, Field Name: {field_name}, Action: {action}, Previous Value: {prev_value}, New Value: {new_value}\n"
 
-    def write_log(self, log_entries):
-        base_filename = f"log_{self._get_current_timestamp()}"
-        
-        # Markdown
-        md_filepath = os.path.join(self.log_directory, base_filename + ".md")
-        with open(md_filepath, 'w') as log_file:
-            for entry in log_entries:
-                if isinstance(entry, dict) and all(key in entry for key in ['action', 'field_name', 'prev_value', 'new_value']):
-                    log_file.write(self.format_log_entry_md(**entry))
-                else:
-                    print(f"Skipped invalid log entry: {entry}")
-
-        # JSON
-        json_filepath = os.path.join(self.log_directory, base_filename + ".json")
-        with open(json_filepath, 'w') as log_file:
-            json.dump(log_entries, log_file, indent=4)
-
-        # Plain Text
-        txt_filepath = os.path.join(self.log_directory, base_filename + ".txt")
-        with open(txt_filepath, 'w') as log_file:
-            for entry in log_entries:
-                log_file.write(self.format_log_entry_txt(**entry))
-        
-        print(f"Logs saved in Markdown, JSON, and TXT formats to {self.log_directory}")
+    def latest_log(self):
+        logs = glob.glob(os.path.join(self.log_directory, "log_*.jsonl"))
+        return max(logs, key=os.path.getmtime) if logs else None
+
+    @staticmethod
+    def read_log(log_path):
+        """Yields the LogEntry records stored in a JSONL log."""
+        with open(log_path, 'r') as log_file:
+            for line in log_file:
+                if line.strip():
+                    yield LogEntry(**json.loads(line))
+
+    def render(self, log_path, fmt: str) -> str:
+        """Renders a JSONL log as 'md' or 'txt' next to the original and returns the new path."""
+        formatter = {"md": self.format_log_entry_md, "txt": self.format_log_entry_txt}[fmt]
+        output_path = os.path.splitext(log_path)[0] + "." + fmt
+        with open(output_path, 'w') as output_file:
+            for entry in self.read_log(log_path):
+                output_file.write(formatter(*entry))
+        return output_path
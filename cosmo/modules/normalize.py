@@ -0,0 +1,54 @@
+# ==========================================
+#   Value Normalization
+#   Brings sheet cells and page values to one
+#   canonical text form before comparing.
+# ==========================================
+
+import datetime
+import numbers
+import pandas as pd
+
+# The page always hands back strings, while pandas gives NaN, ints, floats and
+# Timestamps. Both sides go through normalize_series() so "3" == 3.0, "" == NaN
+# and "café" == "café", and only fields that really differ get written.
+
+
+def format_value(value) -> str:
+    """Renders one non-string cell the way it would read in a form field."""
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, numbers.Integral):
+        return str(int(value))
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        if value.is_integer():
+            return str(int(value))
+        return format(value, ".15g")  # Drops float noise like 0.30000000000000004
+    if isinstance(value, datetime.datetime):
+        if value.time() == datetime.time(0):
+            return value.date().isoformat()
+        return value.isoformat(sep=" ")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+def normalize_series(values: pd.Series) -> pd.Series:
+    """Returns `values` as canonical strings: NaN -> "", numbers formatted,
+    line endings unified, surrounding whitespace stripped, Unicode NFC."""
+    values = values.astype(object)
+    is_text = values.map(type).eq(str).to_numpy()
+    if not is_text.all():
+        values = values.copy()
+        values[~is_text] = values[~is_text].map(format_value)
+
+    text = values.astype(str)
+    text = text.str.replace("\r\n?", "\n", regex=True).str.strip()
+    return text.str.normalize("NFC")
+
+
+def normalize_frame(dataFrame: pd.DataFrame) -> pd.DataFrame:
+    """Normalizes every column of a sheet."""
+    return dataFrame.apply(normalize_series)
@@ -0,0 +1,62 @@
+# ==========================================
+#   Object Store
+#   Content-addressed blobs: each distinct
+#   file is stored once, named by its hash.
+# ==========================================
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+HOME_DIR = os.path.expanduser("~")
+OBJECTS_DIR = os.path.join(HOME_DIR, '.config', 'cosmo', 'objects')
+
+
+def file_digest(filename: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: str, data):
+    """Writes JSON to a temp file and renames it over `path`, so readers never see half a file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Unique per process and thread (fill-batch workers)
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ObjectStore:
+
+    def __init__(self, root: str = OBJECTS_DIR):
+        self.root = root
+
+    def path_for(self, digest: str, ext: str) -> str:
+        # Blobs keep their extension so the sheet loader can still tell xlsx from csv
+        return os.path.join(self.root, digest[:2], f"{digest}.{ext}")
+
+    def has(self, digest: str, ext: str) -> bool:
+        return os.path.exists(self.path_for(digest, ext))
+
+    def put(self, filename: str, digest: str = None) -> str:
+        """Stores `filename` unless identical content is already present. Returns the blob path."""
+        digest = digest or file_digest(filename)
+        blob_path = self.path_for(digest, filename.split('.')[-1])
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            shutil.copyfile(filename, tmp_path)
+            os.replace(tmp_path, blob_path)
+        return blob_path
+
+    def remove(self, digest: str, ext: str):
+        try:
+            os.remove(self.path_for(digest, ext))
+        except FileNotFoundError:
+            pass
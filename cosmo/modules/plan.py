@@ -0,0 +1,72 @@
+# ==========================================
+#   Change Plan
+#   Classifies every sheet row against a
+#   page snapshot in one vectorized pass.
+# ==========================================
+
+import numpy as np
+import pandas as pd
+from .normalize import normalize_series
+from . import profiler
+
+UNCHANGED = "unchanged"  # Page already holds the sheet value
+FILL      = "fill"       # Page field is empty, safe to write
+CONFLICT  = "conflict"   # Page field holds a different, non-empty value
+MISSING   = "missing"    # No field with that name on the page
+
+
+class ChangePlan:
+
+    def __init__(self, frame: pd.DataFrame):
+        # Columns: field_name, sheet_value, page_value, status (one row per sheet row, in sheet order)
+        self.frame = frame
+
+    @classmethod
+    @profiler.profiled("plan.build")
+    def build(cls, dataFrame: pd.DataFrame, page_values: dict) -> "ChangePlan":
+        """Joins the sheet's (field, value) columns against a snapshot and classifies each row.
+
+        Both sides are normalized first, so the plan's values are what gets compared and written.
+        """
+        field_names = dataFrame.iloc[:, 0].astype(str).reset_index(drop=True)
+        sheet_values = normalize_series(dataFrame.iloc[:, 1].reset_index(drop=True))
+
+        page = pd.Series(page_values, dtype=object)
+        found = field_names.isin(page.index).to_numpy()
+        current = normalize_series(field_names.map(page))
+
+        equal = found & (current == sheet_values).to_numpy()
+        empty = found & current.eq("").to_numpy()
+
+        status = np.select([~found, equal, empty], [MISSING, UNCHANGED, FILL], default=CONFLICT)
+
+        return cls(pd.DataFrame({
+            "field_name": field_names,
+            "sheet_value": sheet_values,
+            "page_value": current.astype(object).where(found, None),
+            "status": status,
+        }))
+
+    def __len__(self):
+        return len(self.frame)
+
+    def rows(self, *statuses) -> pd.DataFrame:
+        """Returns the rows whose status is one of `statuses`."""
+        return self.frame[self.frame["status"].isin(statuses)]
+
+    def mismatches(self) -> pd.DataFrame:
+        """Rows found on the page whose value differs from the sheet (empty fields included)."""
+        return self.rows(FILL, CONFLICT)
+
+    def counts(self) -> dict:
+        counts = self.frame["status"].value_counts()
+        return {status: int(counts.get(status, 0)) for status in (UNCHANGED, FILL, CONFLICT, MISSING)}
+
+
+def row_fingerprints(dataFrame: pd.DataFrame) -> pd.Series:
+    """Hashes each sheet row's (field, value) pair; equal rows always hash the same across runs."""
+    pairs = pd.DataFrame({
+        "field_name": dataFrame.iloc[:, 0].astype(str).to_numpy(),
+        "value": dataFrame.iloc[:, 1].astype(str).to_numpy(),
+    })
+    return pd.util.hash_pandas_object(pairs, index=False).map("{:016x}".format)
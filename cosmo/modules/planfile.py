@@ -0,0 +1,57 @@
+# ==========================================
+#   Plan Files
+#   The writes a fill would make, saved with
+#   each field's expected old value so they
+#   can be reviewed and applied later.
+# ==========================================
+
+import gzip
+import json
+import datetime
+import pandas as pd
+
+# A plan is gzipped, column-oriented JSON (like backups):
+#
+#   {"format": "cosmo-plan", "version": 1, "created": <ISO>,
+#    "source": <sheet path>, "digest": <sheet sha256>, "sheet": <name or null>,
+#    "form": <modal title when planned>, "counts": {"unchanged": n, "skipped": n, "missing": n},
+#    "field_name": [...], "action": ["fill"|"overwrite"|"append", ...],
+#    "old_value": [...], "new_value": [...]}
+#
+# old_value is the page value the plan was computed against (normalized);
+# apply only writes a field that still holds it.
+
+PLAN_FORMAT = "cosmo-plan"
+PLAN_VERSION = 1
+
+PLAN_COLUMNS = ("field_name", "action", "old_value", "new_value")
+
+
+class PlanFileError(ValueError):
+    pass
+
+
+def write_plan(path: str, writes: pd.DataFrame, **meta) -> dict:
+    """Saves `writes` (PLAN_COLUMNS) and `meta` to `path`. Returns the saved document."""
+    data = {"format": PLAN_FORMAT, "version": PLAN_VERSION, "created": datetime.datetime.now().isoformat(), **meta}
+    data.update({column: writes[column].tolist() for column in PLAN_COLUMNS})
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    return data
+
+
+def read_plan(path: str) -> dict:
+    """Loads a plan written by write_plan(); its writes come back as a frame under "writes"."""
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise PlanFileError(f"{path} is not a Cosmo plan file: {e}")
+
+    if data.get("format") != PLAN_FORMAT:
+        raise PlanFileError(f"{path} is not a Cosmo plan file.")
+    if data.get("version", 0) > PLAN_VERSION:
+        raise PlanFileError(f"{path} was written by a newer Cosmo (plan version {data['version']}).")
+
+    data["writes"] = pd.DataFrame({column: data.pop(column, []) for column in PLAN_COLUMNS}, columns=list(PLAN_COLUMNS))
+    return data
@@ -0,0 +1,155 @@
+# ==========================================
+#   Profiler
+#   Named spans and counters for --profile,
+#   exported as a Chrome trace. Off by
+#   default, and close to free while off.
+# ==========================================
+
+import os
+import json
+import time
+import datetime
+import threading
+import functools
+
+HOME_DIR = os.path.expanduser("~")
+PROFILES_DIR = os.path.join(HOME_DIR, '.config', 'cosmo', 'profiles')
+
+_enabled = False
+_origin_ns = 0
+_events = []    # (name, start_ns, duration_ns, thread_id, args) per finished span
+_counters = {}
+_counter_lock = threading.Lock()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        # list.append is atomic, so spans from the logger thread need no lock
+        _events.append((self.name, self.start, time.perf_counter_ns() - self.start, threading.get_ident(), self.args))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable():
+    """Starts recording. Spans and counters before this call are no-ops."""
+    global _enabled, _origin_ns
+    _origin_ns = time.perf_counter_ns()
+    _events.clear()
+    _counters.clear()
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **args):
+    """Times a `with` block under `name`. Returns a shared no-op when profiling is off."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+
+def count(name: str, amount: int = 1):
+    """Adds `amount` to the counter `name`."""
+    if _enabled:
+        with _counter_lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def profiled(name: str):
+    """Decorator form of span()."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ==================================
+#   Reporting
+# ==================================
+
+def summary() -> list:
+    """Per-span totals, slowest first: [{name, calls, total_ms, mean_ms, max_ms}, ...]."""
+    totals = {}
+    for name, _, duration, _, _ in list(_events):
+        calls, total, longest = totals.get(name, (0, 0, 0))
+        totals[name] = (calls + 1, total + duration, max(longest, duration))
+
+    rows = [{"name": name, "calls": calls, "total_ms": total / 1e6, "mean_ms": total / calls / 1e6, "max_ms": longest / 1e6}
+            for name, (calls, total, longest) in totals.items()]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def counters() -> dict:
+    with _counter_lock:
+        return dict(_counters)
+
+
+def print_summary(console=None):
+    from rich.table import Table
+    from rich.console import Console
+
+    console = console or Console(stderr=True)
+    table = Table(title="Profile", show_header=True)
+    table.add_column("Phase")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Mean ms", justify="right")
+    table.add_column("Max ms", justify="right")
+
+    for row in summary():
+        table.add_row(row["name"], str(row["calls"]), f"{row['total_ms']:.1f}", f"{row['mean_ms']:.2f}", f"{row['max_ms']:.1f}")
+    console.print(table)
+
+    for name, value in sorted(counters().items()):
+        console.print(f"[cyan]{name}[/cyan]: {value}")
+
+
+def write_trace(path: str = None) -> str:
+    """Writes the recorded spans and counters in Chrome's trace event format
+    (open in chrome://tracing or Perfetto). Returns the path written."""
+    if path is None:
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        path = os.path.join(PROFILES_DIR, f"profile_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    pid = os.getpid()
+    end_us = (time.perf_counter_ns() - _origin_ns) / 1000
+    trace = [
+        {"name": name, "ph": "X", "pid": pid, "tid": tid,
+         "ts": (start - _origin_ns) / 1000, "dur": duration / 1000, "args": args or {}}
+        for name, start, duration, tid, args in list(_events)
+    ]
+    trace.extend({"name": name, "ph": "C", "pid": pid, "tid": 0, "ts": end_us, "args": {name: value}}
+                 for name, value in counters().items())
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+    return path
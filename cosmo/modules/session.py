@@ -0,0 +1,55 @@
+# ==========================================
+#   Browser Session
+#   One WebDriver connection per debugger
+#   address, shared by the whole process.
+# ==========================================
+
+import threading
+from . import profiler
+
+DEFAULT_DEBUGGER_ADDRESS = "127.0.0.1:9222"
+
+# "selenium" goes through chromedriver; "cdp" speaks DevTools to Chrome directly
+BACKENDS = ("selenium", "cdp")
+
+_backend = "selenium"
+_sessions = {}
+_lock = threading.Lock()
+
+
+def set_backend(backend: str):
+    """Chooses the backend used by every later connect()/get_browser() call."""
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose one of: {', '.join(BACKENDS)}")
+    _backend = backend
+
+
+@profiler.profiled("webdriver.connect")
+def connect(debugger_address: str = DEFAULT_DEBUGGER_ADDRESS):
+    """Opens a new browser connection to the Chrome debugging session at `debugger_address`."""
+    if _backend == "cdp":
+        from .cdp import CDPBrowser
+        return CDPBrowser(debugger_address)
+
+    from selenium import webdriver
+
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.add_experimental_option("debuggerAddress", debugger_address)
+    return webdriver.Chrome(options=chrome_options)
+
+
+def get_browser(debugger_address: str = DEFAULT_DEBUGGER_ADDRESS):
+    """Returns the shared WebDriver for `debugger_address`, connecting on first use."""
+    with _lock:
+        browser = _sessions.get((_backend, debugger_address))
+        if browser is None:
+            browser = connect(debugger_address)
+            _sessions[(_backend, debugger_address)] = browser
+        return browser
+
+
+def set_browser(browser, debugger_address: str = DEFAULT_DEBUGGER_ADDRESS):
+    """Registers an existing driver (e.g. a fake one) as the shared session for `debugger_address`."""
+    with _lock:
+        _sessions[(_backend, debugger_address)] = browser
@@ -0,0 +1,191 @@
+# ==========================================
+#   Sheet Loader
+#   Parses Excel/CSV files once and keeps a
+#   pickled sidecar keyed by content hash,
+#   so later commands skip the Excel parse.
+# ==========================================
+
+import os
+import json
+import pickle
+import hashlib
+import threading
+import pandas as pd
+from .objects import file_digest, write_json_atomic
+from .normalize import normalize_frame
+from . import profiler
+
+HOME_DIR = os.path.expanduser("~")
+CACHE_DIR = os.path.join(HOME_DIR, '.config', 'cosmo', 'cache')
+STAMP_DIR = os.path.join(CACHE_DIR, 'paths')
+
+SUPPORTED_EXTENSIONS = ('xlsx', 'csv')
+
+# Bumped whenever parse_workbook() output changes, so older sidecars are ignored
+SIDECAR_VERSION = 3
+
+# A CSV is treated as a workbook with a single sheet of this name
+CSV_SHEET_NAME = "Sheet1"
+
+# Workbooks ({sheet name: frame}) already loaded by this process, keyed by (path, mtime, size)
+_memo = {}
+
+
+class UnsupportedFileError(ValueError):
+    pass
+
+
+class SheetNotFoundError(ValueError):
+    pass
+
+
+def parse_workbook(filename: str) -> dict:
+    """Parses every sheet of a spreadsheet in one pass, bypassing every cache.
+
+    Returns {sheet name: frame} in workbook order. Cells come back as
+    normalized strings. CSVs are read as text outright and Excel cells keep
+    their native type until normalization formats them, so ints never turn
+    into floats. Text like "NA" or "None" stays as written.
+    """
+    file_ext = filename.split('.')[-1]
+    with profiler.span("sheet.parse", format=file_ext):
+        if file_ext == 'xlsx':
+            frames = pd.read_excel(filename, sheet_name=None, dtype=object, keep_default_na=False, na_values=[])
+        elif file_ext == 'csv':
+            frames = {CSV_SHEET_NAME: pd.read_csv(filename, dtype=str, keep_default_na=False, na_values=[])}
+        else:
+            raise UnsupportedFileError(f"Unsupported file format: {filename}")
+    with profiler.span("sheet.normalize"):
+        return {name: normalize_frame(frame) for name, frame in frames.items()}
+
+
+def parse_sheet(filename: str) -> pd.DataFrame:
+    """Parses the first sheet of a spreadsheet, bypassing every cache."""
+    return next(iter(parse_workbook(filename).values()))
+
+
+def _stamp_path(filename: str) -> str:
+    key = hashlib.sha1(os.path.abspath(filename).encode('utf-8')).hexdigest()
+    return os.path.join(STAMP_DIR, key + '.json')
+
+
+def _sidecar_path(digest: str) -> str:
+    return os.path.join(CACHE_DIR, f"{digest}.v{SIDECAR_VERSION}.pkl")
+
+
+def _read_stamp(filename: str) -> dict:
+    try:
+        with open(_stamp_path(filename), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_stamp(filename: str, stat: os.stat_result, digest: str):
+    write_json_atomic(_stamp_path(filename), {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest})
+
+
+def _read_sidecar(digest: str):
+    try:
+        with open(_sidecar_path(digest), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _write_sidecar(digest: str, workbook: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Other processes (or fill-batch threads) may be caching the same workbook right now
+    tmp_path = f"{_sidecar_path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(workbook, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, _sidecar_path(digest))
+
+
+def _store_workbook(filename: str) -> dict:
+    stat = os.stat(filename)
+    digest = file_digest(filename)
+    workbook = _read_sidecar(digest)
+    if workbook is None:
+        workbook = parse_workbook(filename)
+        _write_sidecar(digest, workbook)
+    _write_stamp(filename, stat, digest)
+    _memo[(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)] = workbook
+    return workbook
+
+
+def _cached_workbook(filename: str) -> dict:
+    """Returns the shared (uncopied) workbook, going to pandas only when the cached sidecar is stale.
+
+    A matching mtime and size trusts the stamp outright. Otherwise the file is
+    hashed, so a touched-but-unchanged file (or an identical copy, such as the
+    staged one) still reuses the existing sidecar.
+    """
+    if filename.split('.')[-1] not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileError(f"Unsupported file format: {filename}")
+
+    stat = os.stat(filename)
+    memo_key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _memo:
+        return _memo[memo_key]
+
+    stamp = _read_stamp(filename)
+    workbook = None
+    if stamp.get("mtime_ns") == stat.st_mtime_ns and stamp.get("size") == stat.st_size:
+        workbook = _read_sidecar(stamp["digest"])
+
+    if workbook is None:
+        return _store_workbook(filename)
+
+    _memo[memo_key] = workbook
+    return workbook
+
+
+def write_sidecar(filename: str) -> list:
+    """Parses every sheet of `filename` and stores its sidecar. Called when a file is staged.
+    Returns the sheet names."""
+    return list(_store_workbook(filename))
+
+
+def sheet_names(filename: str) -> list:
+    """The sheets of a workbook in order (a CSV has the single sheet CSV_SHEET_NAME)."""
+    return list(_cached_workbook(filename))
+
+
+@profiler.profiled("sheet.load")
+def load_workbook(filename: str) -> dict:
+    """Loads every sheet at once: {sheet name: frame}. Parsed at most once per file content."""
+    return {name: frame.copy() for name, frame in _cached_workbook(filename).items()}
+
+
+@profiler.profiled("sheet.load")
+def load_sheet(filename: str, sheet: str = None) -> pd.DataFrame:
+    """Loads one sheet (the first unless `sheet` names another) from the cached workbook."""
+    workbook = _cached_workbook(filename)
+    if sheet is None:
+        return next(iter(workbook.values())).copy()
+    if sheet not in workbook:
+        raise SheetNotFoundError(f"Sheet '{sheet}' not found in {filename}. Sheets: {', '.join(workbook)}")
+    return workbook[sheet].copy()
+
+
+# ==================================
+#   Reporting to the user
+# ==================================
+
+UNSUPPORTED_FILE_MESSAGE = "Unsupported file format. Please provide an Excel or CSV file."
+
+
+def report_sheet_error(error: ValueError, console):
+    """Prints an UnsupportedFileError or SheetNotFoundError the way every command shows it."""
+    message = UNSUPPORTED_FILE_MESSAGE if isinstance(error, UnsupportedFileError) else str(error)
+    console.print(f"[red]{message}[/red]")
+
+
+def load_or_report(filename: str, sheet: str, console) -> pd.DataFrame:
+    """load_sheet(), but an unsupported file or unknown sheet is printed to `console` and None returned."""
+    try:
+        return load_sheet(filename, sheet)
+    except (UnsupportedFileError, SheetNotFoundError) as e:
+        report_sheet_error(e, console)
+        return None
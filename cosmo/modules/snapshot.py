@@ -0,0 +1,26 @@
+# ==========================================
+#   Page Snapshot
+#   Reads every named field on the page in
+#   a single WebDriver round trip.
+# ==========================================
+
+from .fields import FIELD_INDEX_JS
+from . import profiler
+
+# Elements come from the page's field index, so repeat snapshots skip the
+# document scan. The first element in document order wins for shared names.
+SNAPSHOT_SCRIPT = FIELD_INDEX_JS + """
+const values = {};
+for (const name of fieldIndex.names()) {
+    const el = fieldIndex.resolve(name);
+    if (!el) { continue; }
+    values[name] = (el.value !== undefined) ? el.value : el.getAttribute('value');
+}
+return values;
+"""
+
+
+@profiler.profiled("page.snapshot")
+def snapshot_values(browser) -> dict:
+    """Returns a {field_name: value} map of every named element on the page."""
+    return browser.execute_script(SNAPSHOT_SCRIPT) or {}
@@ -0,0 +1,174 @@
+# ==========================================
+#   Streaming Sheet Reader
+#   Parses large sheets in fixed-size chunks
+#   on a background thread, so writing can
+#   start before the whole file is read.
+# ==========================================
+
+import os
+import queue
+import threading
+import pandas as pd
+from .normalize import normalize_frame
+from .sheets import SUPPORTED_EXTENSIONS, UnsupportedFileError, SheetNotFoundError, CSV_SHEET_NAME
+from . import profiler
+
+# Rows per chunk, and how many parsed chunks may wait for the consumer.
+# At most (PREFETCH_CHUNKS + 2) chunks are in memory at once.
+STREAM_CHUNK_ROWS = 5000
+PREFETCH_CHUNKS = 2
+
+# Bytes read from the top of a CSV to estimate its row count
+ESTIMATE_SAMPLE_BYTES = 1 << 16
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+# ==================================
+#   Row estimate
+# ==================================
+
+def _worksheet(workbook, filename: str, sheet: str = None):
+    if sheet is None:
+        return workbook.worksheets[0]
+    if sheet not in workbook.sheetnames:
+        raise SheetNotFoundError(f"Sheet '{sheet}' not found in {filename}. Sheets: {', '.join(workbook.sheetnames)}")
+    return workbook[sheet]
+
+
+def estimate_rows(filename: str, sheet: str = None) -> int:
+    """Estimates the data rows in a sheet without parsing it.
+
+    xlsx reads the sheet's stored dimensions; CSV extrapolates the line
+    length of the first 64 KB over the file size (exact for small files).
+    """
+    file_ext = filename.split('.')[-1]
+    if file_ext == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(filename, read_only=True)
+        try:
+            return max((_worksheet(workbook, filename, sheet).max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+
+    size = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        sample = f.read(ESTIMATE_SAMPLE_BYTES)
+    lines = sample.count(b'\n') + (0 if sample.endswith(b'\n') else 1)
+    if len(sample) >= size:
+        return max(lines - 1, 0)
+    return max(int(size / len(sample) * lines) - 1, 0)
+
+
+# ==================================
+#   Chunk readers
+# ==================================
+
+def _csv_chunks(filename: str, chunk_rows: int):
+    reader = pd.read_csv(filename, dtype=str, keep_default_na=False, na_values=[], chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _xlsx_chunks(filename: str, chunk_rows: int, sheet: str = None):
+    from openpyxl import load_workbook
+
+    # read_only streams rows from the zip instead of building the whole workbook
+    workbook = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        rows = _worksheet(workbook, filename, sheet).iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        width = len(header)
+        batch = []
+        for row in rows:
+            if all(cell is None for cell in row):
+                continue # read_only mode reports formatted-but-empty rows
+            batch.append(row[:width])
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, dtype=object)
+    finally:
+        workbook.close()
+
+
+def read_chunks(filename: str, chunk_rows: int = STREAM_CHUNK_ROWS, sheet: str = None):
+    """Yields the sheet (the first unless `sheet` names another) as normalized
+    DataFrames of at most `chunk_rows` rows, in order."""
+    file_ext = filename.split('.')[-1]
+    if file_ext not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileError(f"Unsupported file format: {filename}")
+    if file_ext == 'csv' and sheet not in (None, CSV_SHEET_NAME):
+        raise SheetNotFoundError(f"Sheet '{sheet}' not found in {filename}. Sheets: {CSV_SHEET_NAME}")
+    chunks = _xlsx_chunks(filename, chunk_rows, sheet) if file_ext == 'xlsx' else _csv_chunks(filename, chunk_rows)
+
+    while True:
+        with profiler.span("sheet.chunk"):
+            chunk = next(chunks, None)
+            if chunk is None:
+                return
+            chunk = normalize_frame(chunk)
+        yield chunk
+
+
+# ==================================
+#   Background prefetch
+# ==================================
+
+def _put(items: queue.Queue, item, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def stream_sheet(filename: str, chunk_rows: int = STREAM_CHUNK_ROWS, prefetch: int = PREFETCH_CHUNKS, sheet: str = None):
+    """Streams a sheet's chunks, parsing ahead on a background thread.
+
+    Raises UnsupportedFileError straight away for other formats. Stopping
+    early (break, exception) shuts the reader thread down.
+    """
+    if filename.split('.')[-1] not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileError(f"Unsupported file format: {filename}")
+    if not os.path.exists(filename):
+        raise FileNotFoundError(filename)
+    return _prefetched(filename, chunk_rows, prefetch, sheet)
+
+
+def _prefetched(filename: str, chunk_rows: int, prefetch: int, sheet: str = None):
+    items = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for chunk in read_chunks(filename, chunk_rows, sheet):
+                if not _put(items, chunk, stop):
+                    return
+            _put(items, _DONE, stop)
+        except BaseException as e:
+            _put(items, _Failure(e), stop)
+
+    reader = threading.Thread(target=produce, daemon=True)
+    reader.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,60 @@
+# ==========================================
+#   Sheet Targets
+#   Maps each sheet of a workbook to the
+#   modal (by title) or tab it belongs to.
+# ==========================================
+
+from .config import config_section
+
+MODAL_TITLE_SELECTOR = ".MuiTypography-h6"
+
+
+def sheet_targets() -> dict:
+    """The [Sheets] table of config.toml: {sheet name: modal title text or window handle}."""
+    return {str(sheet): str(target) for sheet, target in config_section('Sheets').items()}
+
+
+def target_for(sheet: str, targets: dict = None) -> str:
+    """A sheet without a [Sheets] entry targets the modal whose title contains the sheet name."""
+    targets = sheet_targets() if targets is None else targets
+    return targets.get(sheet, sheet)
+
+
+def _modal_title(browser) -> str:
+    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import NoSuchElementException
+    try:
+        return browser.find_element(By.CSS_SELECTOR, MODAL_TITLE_SELECTOR).text
+    except NoSuchElementException:
+        return ""
+
+
+def _matches(browser, target: str) -> bool:
+    return target in _modal_title(browser) or target == getattr(browser, "title", None)
+
+
+def switch_to_target(browser, target: str) -> bool:
+    """Brings `target` forward: a window handle, or the tab whose modal title (or page title) contains it.
+
+    The current tab is checked first. Backends without window handles (CDP)
+    only see the page they are attached to. Returns False, leaving the
+    original tab selected, when nothing matches.
+    """
+    handles = list(getattr(browser, "window_handles", None) or [])
+    if target in handles:
+        browser.switch_to.window(target)
+        return True
+    if _matches(browser, target):
+        return True
+    if not handles:
+        return False
+
+    original = browser.current_window_handle
+    for handle in handles:
+        if handle == original:
+            continue
+        browser.switch_to.window(handle)
+        if _matches(browser, target):
+            return True
+    browser.switch_to.window(original)
+    return False
@@ -0,0 +1,120 @@
+# ==========================================
+#   Bulk Writer
+#   Sets many field values per WebDriver
+#   round trip instead of typing each one.
+# ==========================================
+
+from .fields import FIELD_INDEX_JS
+from . import profiler
+
+# Values go through the prototype's native setter so React/MUI notices the
+# change (assigning el.value directly is swallowed by React's value tracker),
+# then input/change events are dispatched so the form state updates. Other
+# named elements (button, output, ...) get a plain assignment, since the input
+# setter throws on them. An element that still fails is reported with the
+# missing fields, so one bad field never aborts the rest of its chunk.
+SET_VALUE_JS = """
+const nativeSetters = new Map([HTMLInputElement, HTMLTextAreaElement, HTMLSelectElement].map(
+    (type) => [type, Object.getOwnPropertyDescriptor(type.prototype, 'value').set]));
+const setValue = (el, value) => {
+    try {
+        const type = [...nativeSetters.keys()].find((type) => el instanceof type);
+        if (type) { nativeSetters.get(type).call(el, value); } else { el.value = value; }
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return true;
+    } catch (e) {
+        return false;
+    }
+};
+"""
+
+# Elements are resolved through the page's field index rather than queried.
+WRITE_SCRIPT = FIELD_INDEX_JS + SET_VALUE_JS + """
+const entries = arguments[0];
+const missing = [];
+for (const [name, value] of entries) {
+    const el = fieldIndex.resolve(name);
+    if (!el || !setValue(el, value)) { missing.push(name); }
+}
+return missing;
+"""
+
+# Used to apply saved plans: each entry also carries the value the plan
+# expected the field to hold, and the field is only written if it still holds
+# it (compared after the same normalization the plan used). Fields that
+# changed in the meantime come back with their current value, untouched.
+CHECKED_WRITE_SCRIPT = FIELD_INDEX_JS + SET_VALUE_JS + """
+const entries = arguments[0];
+const missing = [];
+const stale = [];
+const canonical = (text) => String(text ?? '').replace(/\\r\\n?/g, '\\n').trim().normalize('NFC');
+for (const [name, expected, value] of entries) {
+    const el = fieldIndex.resolve(name);
+    if (!el) { missing.push(name); continue; }
+    const current = (el.value !== undefined) ? el.value : el.getAttribute('value');
+    if (canonical(current) !== expected) { stale.push([name, current]); continue; }
+    if (!setValue(el, value)) { missing.push(name); }
+}
+return { missing: missing, stale: stale };
+"""
+
+# Fields written per execute_script call. Keeps each request body reasonably
+# small even when every value is a long translation paragraph.
+WRITE_CHUNK_SIZE = 250
+
+
+def _as_text(value) -> str:
+    if value is None or value != value:  # None or NaN
+        return ""
+    return str(value)
+
+
+def _run_chunks(browser, script: str, chunks: list, on_chunk=None):
+    """Runs `script` once per chunk and yields each call's result in order."""
+    # Pipelined backends (CDP) get every chunk in flight before the first reply
+    if hasattr(browser, "execute_script_many"):
+        with profiler.span("page.write", fields=sum(map(len, chunks)), chunks=len(chunks)):
+            for chunk, result in zip(chunks, browser.execute_script_many(script, [(chunk,) for chunk in chunks])):
+                yield result
+                if on_chunk:
+                    on_chunk(len(chunk))
+        return
+
+    for chunk in chunks:
+        with profiler.span("page.write", fields=len(chunk)):
+            result = browser.execute_script(script, chunk)
+        yield result
+        if on_chunk:
+            on_chunk(len(chunk))
+
+
+def _chunked(entries: list, chunk_size: int) -> list:
+    return [entries[start:start + chunk_size] for start in range(0, len(entries), chunk_size)]
+
+
+def write_values(browser, values: dict, chunk_size: int = WRITE_CHUNK_SIZE, on_chunk=None) -> list:
+    """Writes a {field_name: value} map to the page in chunked script calls.
+
+    Returns the names of fields that were not found on the page or could not be set. `on_chunk`,
+    if given, is called with the number of fields handled after each chunk.
+    """
+    entries = [[str(name), _as_text(value)] for name, value in values.items()]
+    missing = []
+    for result in _run_chunks(browser, WRITE_SCRIPT, _chunked(entries, chunk_size), on_chunk):
+        missing.extend(result or [])
+    return missing
+
+
+def write_values_checked(browser, entries, chunk_size: int = WRITE_CHUNK_SIZE, on_chunk=None):
+    """Writes (field_name, expected_value, value) entries, each only if the field still holds `expected_value`.
+
+    Returns (names of fields not found or not settable, {stale field name: its current value}).
+    """
+    entries = [[str(name), _as_text(expected), _as_text(value)] for name, expected, value in entries]
+    missing, stale = [], {}
+    for result in _run_chunks(browser, CHECKED_WRITE_SCRIPT, _chunked(entries, chunk_size), on_chunk):
+        result = result or {}
+        missing.extend(result.get("missing") or [])
+        stale.update(result.get("stale") or [])
+    return missing, stale
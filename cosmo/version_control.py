@@ -1,98 +1,179 @@
-import shutil
 import os
+import json
 import datetime
-import toml
-from rich import print
-from rich.console import Console
+from .modules.objects import ObjectStore, file_digest, write_json_atomic
+from .modules.config import load_state, update_state, state_lock
 
 home_directory = os.path.expanduser("~")
 
-CONFIG_PATH = os.path.join(home_directory, '.config', 'cosmo', 'config.toml')
 VERSIONS_DIR = os.path.join(home_directory, '.config', 'cosmo', 'versions')
 STAGING_PATH = os.path.join(home_directory, '.config', 'cosmo', 'staging')
 BACKUP_DIR = os.path.join(home_directory, '.config', 'cosmo', 'backups')
 
+# Metadata for every committed version, plus the stat/hash of files staged before
+VERSION_INDEX_PATH = os.path.join(VERSIONS_DIR, 'index.json')
+
+NOT_STAGED = "No file currently staged."
+
 class VersionControl:
 
 
     def __init__(self, filename=None):
-        
-        self.console = Console()
 
         # Ensure backup directory exists
         if not os.path.exists(BACKUP_DIR):
             os.makedirs(BACKUP_DIR)
+
+        self.store = ObjectStore()
         
         if filename:
             self.filename = os.path.abspath(filename)  # Store the absolute path
         else:
-            config = toml.load(CONFIG_PATH)
-            self.filename = config.get('VCS', {}).get('staged_file', None)
+            staged_file = self.staged_file()
+            self.filename = None if staged_file == NOT_STAGED else staged_file
 
+    # ==================================
+    #   Version index
+    # ==================================
 
-    def stage(self):
-        #check for staging dir, and if it's not there, make one
-        staging_dir = os.path.join(home_directory, '.config', 'cosmo', 'staging')
-        if not os.path.exists(staging_dir):
-            os.makedirs(staging_dir)
+    def load_index(self) -> dict:
+        try:
+            with open(VERSION_INDEX_PATH, 'r') as index_file:
+                index = json.load(index_file)
+        except (FileNotFoundError, ValueError):
+            index = {}
+        index.setdefault('versions', [])
+        index.setdefault('sources', {})
+        return index
 
-        # Extract the original filename from the given path
-        original_filename = os.path.basename(self.filename)
-        
-        # Construct the staging path using the original filename
-        staging_file_path = os.path.join(home_directory, '.config', 'cosmo', 'staging', original_filename)
-        
-        # Copy the given Excel file to the staging area with its original filename
-        shutil.copyfile(self.filename, staging_file_path)
-        
-        # Update config.toml
-        config = toml.load(CONFIG_PATH)
-        if 'VCS' not in config:
-            config['VCS'] = {}
-        config['VCS']['staged_file'] = staging_file_path
-        with open(CONFIG_PATH, 'w') as config_file:
-            toml.dump(config, config_file)
+    def save_index(self, index: dict):
+        write_json_atomic(VERSION_INDEX_PATH, index)
+
+    def _update_vcs(self, **values):
+        update_state(**values)  # Locked and atomic, so parallel cosmo processes never see half a write
+
+    def _source_digest(self, index: dict) -> str:
+        """Hashes self.filename, skipping the read when its size and mtime match the last stage."""
+        stat = os.stat(self.filename)
+        known = index['sources'].get(self.filename)
+        if known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+            return known['digest']
+        digest = file_digest(self.filename)
+        index['sources'][self.filename] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest}
+        return digest
+
+    def find_version(self, version: str, index: dict = None):
+        """Looks a version up by name, commit message or (a prefix of) its content hash. Newest wins."""
+        index = index or self.load_index()
+        for entry in reversed(index['versions']):
+            if version in (entry['name'], entry['message']) or entry['digest'].startswith(version):
+                return entry
+        return None
+
+    def list_versions(self) -> list:
+        return self.load_index()['versions']
+
+    # ==================================
+    #   Stage / commit / rollback
+    # ==================================
+
+    def stage(self, sheet: str = None) -> dict:
+        """Stores the file in the object store (once per distinct content) and points the stage at it.
+        `sheet` (a sheet name or "all") becomes the default --sheet for fill, verify and diff.
+
+        Returns {'path', 'digest', 'copied', 'same_as'} where 'same_as' names a
+        committed version with identical content, if there is one.
+        """
+        # index.json and the state change together, so another cosmo process can't interleave
+        with state_lock():
+            index = self.load_index()
+            digest = self._source_digest(index)
+            ext = self.filename.split('.')[-1]
+            copied = not self.store.has(digest, ext)
+            staging_file_path = self.store.put(self.filename, digest)
+
+            if copied:
+                from .modules.sheets import write_sidecar, SUPPORTED_EXTENSIONS
+
+                # Parse once now so fill/verify/diff can load the staged sheet from its sidecar
+                if ext in SUPPORTED_EXTENSIONS:
+                    write_sidecar(staging_file_path)
+
+            self.save_index(index)
+            self._update_vcs(staged_file=staging_file_path, staged_name=os.path.basename(self.filename), staged_sheet=sheet or "")
+
+        same_as = next((entry['name'] for entry in reversed(index['versions']) if entry['digest'] == digest), None)
+        return {"path": staging_file_path, "digest": digest, "copied": copied, "same_as": same_as}
     
     def unstage(self):
         """Unstage the currently staged file."""
-        # Remove the staged file if it exists
-        staged_file = self.staged_file()
-        if staged_file != "No file currently staged.":
-            os.remove(staged_file)
-            
-            # Update config.toml
-            config = toml.load(CONFIG_PATH)
-            config['VCS']['staged_file'] = "none"
-            with open(CONFIG_PATH, 'w') as config_file:
-                toml.dump(config, config_file)
-        else:
-            print("No file currently staged.")
+        with state_lock():
+            staged_file = self.staged_file(fresh=True)
+            if staged_file != NOT_STAGED:
+                if staged_file.startswith(STAGING_PATH + os.sep):
+                    # Copies staged before the object store existed
+                    if os.path.exists(staged_file):
+                        os.remove(staged_file)
+                else:
+                    # Blobs that a committed version still points at are kept
+                    digest, ext = os.path.basename(staged_file).split('.', 1)
+                    if not any(entry['digest'] == digest for entry in self.load_index()['versions']):
+                        self.store.remove(digest, ext)
 
-    def commit(self, commit_message):
-        # Create a versioned filename
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        versioned_filename = f"{timestamp}_{commit_message}.xlsx"
-        versioned_filepath = os.path.join(VERSIONS_DIR, versioned_filename)
-        
-        # Move staged file to versions directory
-        shutil.move(STAGING_PATH, versioned_filepath)
-        
-        # Update config.toml
-        config = toml.load(CONFIG_PATH)
-        config['VCS']['current_version'] = versioned_filename
-        config['VCS']['staged_file'] = "none"
-        with open(CONFIG_PATH, 'w') as config_file:
-            toml.dump(config, config_file)
+                self._update_vcs(staged_file="none", staged_name="", staged_sheet="")
+                return
+
+        from rich import print
+        print(NOT_STAGED)
+
+    def _blob_for(self, staged_file: str):
+        """(digest, ext) of the staged file's blob. A file staged before the object store
+        existed (a copy under staging/) is added to the store first."""
+        if os.path.dirname(os.path.dirname(os.path.abspath(staged_file))) == os.path.abspath(self.store.root):
+            return tuple(os.path.basename(staged_file).split('.', 1))
+        if not os.path.exists(staged_file):
+            raise ValueError(f"The staged file {staged_file} no longer exists. Stage the sheet again before committing.")
+        digest = file_digest(staged_file)
+        self.store.put(staged_file, digest)
+        return digest, staged_file.split('.')[-1]
+
+    def commit(self, commit_message) -> dict:
+        """Records the staged blob as a new version. Nothing is copied or moved."""
+        with state_lock():
+            state = load_state(fresh=True)
+            staged_file = state['staged_file']
+            if not staged_file or staged_file == "none":
+                raise ValueError(NOT_STAGED)
+
+            index = self.load_index()
+            digest, ext = self._blob_for(staged_file)
+
+            timestamp = datetime.datetime.now()
+            entry = {
+                "name": f"{timestamp.strftime('%Y%m%d_%H%M%S')}_{commit_message}",
+                "digest": digest,
+                "ext": ext,
+                "source": state['staged_name'],
+                "sheet": state['staged_sheet'],
+                "message": commit_message,
+                "timestamp": timestamp.isoformat(),
+            }
+            index['versions'].append(entry)
+            self.save_index(index)
+
+            self._update_vcs(current_version=entry['name'], staged_file="none", staged_name="", staged_sheet="")
+        return entry
 
     def rollback(self, version):
-        versioned_filepath = os.path.join(VERSIONS_DIR, version)
-        # Replace the current Excel file with the versioned file
-        shutil.copyfile(versioned_filepath, STAGING_PATH)
-        # Update config.toml
-        config = toml.load(CONFIG_PATH)
-        config['VCS']['current_version'] = version
-        with open(CONFIG_PATH, 'w') as config_file:
-            toml.dump(config, config_file)
+        """Stages a committed version again by pointing at its blob."""
+        with state_lock():
+            entry = self.find_version(version)
+            if entry is None:
+                raise ValueError(f"Version {version} not found.")
+
+            self._update_vcs(staged_file=self.store.path_for(entry['digest'], entry['ext']),
+                             staged_name=entry['source'], staged_sheet=entry.get('sheet', ""), current_version=entry['name'])
+        return entry
 
     def backup(self, data):
         timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
@@ -101,6 +182,14 @@ class VersionControl:
         return backup_path
 
 
-    def staged_file(self):
-        config = toml.load(CONFIG_PATH)
-        return config.get('VCS', {}).get('staged_file', "No file currently staged.")
\ No newline at end of file
+    def staged_name(self):
+        """Original file name of the staged sheet (the staged path itself is a content hash)."""
+        return load_state()['staged_name']
+
+    def staged_sheet(self):
+        """Sheet chosen when the file was staged ("" for the first sheet, or "all")."""
+        return load_state()['staged_sheet']
+
+    def staged_file(self, fresh: bool = False):
+        staged_file = load_state(fresh)['staged_file']
+        return staged_file if staged_file and staged_file != "none" else NOT_STAGED
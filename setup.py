@@ -29,8 +29,12 @@ setup(
         'pandas',
         'rich',
         'toml',
-        'selenium'
+        'selenium',
+        'openpyxl'
     ],
+    extras_require={
+        'cdp': ['websockets'],
+    },
     entry_points={
         'console_scripts': [
             'cosmo=cosmo.main:app',